@@ -1,6 +1,7 @@
 """The Ariston integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
 import voluptuous as vol
@@ -8,16 +9,42 @@ import voluptuous as vol
 from .ariston import AristonAPI, DeviceFeatures
 from .coordinator import DeviceDataUpdateCoordinator, DeviceEnergyUpdateCoordinator
 from .const import (
+    ADAPTIVE_SCAN_INTERVAL,
+    API,
+    API_CLIENTS,
+    API_ENTRIES,
+    API_LOGIN,
+    API_OPTIONS,
+    CONNECT_TIMEOUT,
     COORDINATOR,
+    DEFAULT_ADAPTIVE_SCAN_INTERVAL,
+    DEFAULT_CONNECT_TIMEOUT_SECONDS,
     DEFAULT_ENERGY_SCAN_INTERVAL_MINUTES,
     DEFAULT_EXTRA_ENERGY_FEATURES,
+    DEFAULT_FAST_SCAN_INTERVAL_SECONDS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_SCAN_INTERVAL_SECONDS,
+    DEFAULT_MIN_SCAN_INTERVAL_SECONDS,
+    DEFAULT_RATE_LIMIT_PER_MINUTE,
+    DEFAULT_READ_TIMEOUT_SECONDS,
     DEFAULT_SCAN_INTERVAL_SECONDS,
+    DEFAULT_UPDATE_DEADLINE_SECONDS,
+    DEFAULT_WRITE_DEBOUNCE_MILLISECONDS,
     DOMAIN,
     ENERGY_COORDINATOR,
     ENERGY_SCAN_INTERVAL,
     EXTRA_ENERGY_FEATURES,
+    FAST_SCAN_INTERVAL,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    RATE_LIMIT,
+    READ_TIMEOUT,
+    UPDATE_DEADLINE,
+    WRITE_DEBOUNCE,
 )
 from .device import AristonDevice
+from .energy_statistics import ConsumptionStatisticsImporter
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -33,6 +60,7 @@ from homeassistant.helpers import (
     config_validation as cv,
     device_registry as dr,
 )
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -62,32 +90,65 @@ SET_ITEM_BY_ID_SCHEMA = vol.Schema(
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ariston from a config entry."""
-    api = AristonAPI(
-        entry.data[CONF_USERNAME],
-        entry.data[CONF_PASSWORD],
-    )
-    reponse = await api.async_connect()
-    if not reponse:
+    api = await _async_acquire_api(hass, entry)
+    if api is None:
         _LOGGER.error("Failed to connect to Ariston")
         return False
 
+    try:
+        return await _async_setup_device(hass, entry, api)
+    except BaseException:
+        # A failed setup is never unloaded, the shared client must not leak
+        hass.data[DOMAIN].pop(entry.unique_id, None)
+        await _async_release_api(hass, entry)
+        raise
+
+
+async def _async_setup_device(
+    hass: HomeAssistant, entry: ConfigEntry, api: AristonAPI
+) -> bool:
+    """Set up the device, its coordinators and platforms with the logged in API"""
     extra_energy_features = entry.options.get(
         EXTRA_ENERGY_FEATURES, DEFAULT_EXTRA_ENERGY_FEATURES
     )
 
+    write_debounce_milliseconds = entry.options.get(
+        WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE_MILLISECONDS
+    )
+
     device = AristonDevice(
-        entry.data[CONF_DEVICE], api, extra_energy_features, hass.config.units.is_metric
+        entry.data[CONF_DEVICE],
+        api,
+        extra_energy_features,
+        hass.config.units.is_metric,
+        write_debounce_milliseconds / 1000,
     )
     await device.async_get_features()
 
     scan_interval_seconds = entry.options.get(
         CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL_SECONDS
     )
-    coordinator = DeviceDataUpdateCoordinator(hass, device, scan_interval_seconds)
+    update_deadline_seconds = entry.options.get(
+        UPDATE_DEADLINE, DEFAULT_UPDATE_DEADLINE_SECONDS
+    )
+    fast_scan_interval_seconds = entry.options.get(
+        FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL_SECONDS
+    )
+    coordinator = DeviceDataUpdateCoordinator(
+        hass,
+        device,
+        scan_interval_seconds,
+        update_deadline_seconds,
+        fast_scan_interval_seconds,
+        entry.options.get(ADAPTIVE_SCAN_INTERVAL, DEFAULT_ADAPTIVE_SCAN_INTERVAL),
+        entry.options.get(MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL_SECONDS),
+        entry.options.get(MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL_SECONDS),
+    )
 
     hass.data.setdefault(DOMAIN, {}).setdefault(
-        entry.unique_id, {COORDINATOR: {}, ENERGY_COORDINATOR: {}}
+        entry.unique_id, {API: {}, COORDINATOR: {}, ENERGY_COORDINATOR: {}}
     )
+    hass.data[DOMAIN][entry.unique_id][API] = api
     hass.data[DOMAIN][entry.unique_id][COORDINATOR] = coordinator
 
     platforms: list[str] = PLATFORMS.copy()
@@ -96,13 +157,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         platforms.append(Platform.WATER_HEATER)
 
     await coordinator.async_config_entry_first_refresh()
+    if coordinator.adaptive_scan_interval:
+        # Not before the first refresh, which polls every item
+        entry.async_on_unload(coordinator.subscribe_activity_items())
 
     if device.features[DeviceFeatures.HAS_METERING]:
         energy_interval_minutes = entry.options.get(
             ENERGY_SCAN_INTERVAL, DEFAULT_ENERGY_SCAN_INTERVAL_MINUTES
         )
         energy_coordinator = DeviceEnergyUpdateCoordinator(
-            hass, device, energy_interval_minutes
+            hass,
+            device,
+            energy_interval_minutes,
+            update_deadline_seconds,
+            ConsumptionStatisticsImporter(hass, device),
         )
         hass.data[DOMAIN][entry.unique_id][ENERGY_COORDINATOR] = energy_coordinator
         await energy_coordinator.async_config_entry_first_refresh()
@@ -110,6 +178,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.config_entries.async_setup_platforms(entry, platforms)
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
+    entry.async_on_unload(coordinator.stop_write_confirmation)
 
     async def async_set_item_by_id_service(service_call):
         """Create a vacation on the target device."""
@@ -137,6 +206,70 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_acquire_api(hass: HomeAssistant, entry: ConfigEntry) -> AristonAPI:
+    """Get the API client shared by the config entries of the same account"""
+    username = entry.data[CONF_USERNAME]
+    api_clients = hass.data.setdefault(DOMAIN, {}).setdefault(API_CLIENTS, {})
+
+    api_options = {
+        "connect_timeout": entry.options.get(
+            CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT_SECONDS
+        ),
+        "read_timeout": entry.options.get(READ_TIMEOUT, DEFAULT_READ_TIMEOUT_SECONDS),
+        "rate_limit": entry.options.get(RATE_LIMIT, DEFAULT_RATE_LIMIT_PER_MINUTE),
+        "max_concurrent_requests": entry.options.get(
+            MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        ),
+    }
+
+    client = api_clients.get(username)
+    if client is None:
+        api = AristonAPI(
+            username,
+            entry.data[CONF_PASSWORD],
+            async_get_clientsession(hass),
+            **api_options,
+        )
+        client = api_clients[username] = {
+            API: api,
+            API_ENTRIES: set(),
+            API_LOGIN: hass.async_create_task(api.async_connect()),
+        }
+    elif client[API_OPTIONS] != api_options:
+        # The timeouts and limits are per account, the entry set up last sets them
+        _LOGGER.info(
+            "Request options of %s now apply to every plant of the account",
+            entry.title,
+        )
+        client[API].configure(**api_options)
+    client[API_OPTIONS] = api_options
+    client[API_ENTRIES].add(entry.entry_id)
+
+    # Every entry of the account waits for the same login
+    logged_in = False
+    try:
+        logged_in = await asyncio.shield(client[API_LOGIN])
+    finally:
+        if not logged_in:
+            await _async_release_api(hass, entry)
+
+    return client[API] if logged_in else None
+
+
+async def _async_release_api(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release the shared API client, close it when no entry uses it anymore"""
+    api_clients = hass.data[DOMAIN][API_CLIENTS]
+
+    client = api_clients.get(entry.data[CONF_USERNAME])
+    if client is None:
+        return
+
+    client[API_ENTRIES].discard(entry.entry_id)
+    if not client[API_ENTRIES]:
+        api_clients.pop(entry.data[CONF_USERNAME])
+        await client[API].async_close()
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -155,5 +288,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.unique_id)
+        await _async_release_api(hass, entry)
 
     return unload_ok
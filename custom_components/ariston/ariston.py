@@ -2,12 +2,35 @@
 from __future__ import annotations
 
 import aiohttp
+import asyncio
+import heapq
+import itertools
+import json
 import logging
+import random
+import time
 
 from typing import Any, final
 from datetime import date
 from enum import IntFlag, unique
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # noqa: F401 pylint: disable=unused-import
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401 pylint: disable=unused-import
+
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
 ARISTON_API_URL: final = "https://www.ariston-net.remotethermo.com/api/v2/"
 ARISTON_LOGIN: final = "accounts/login"
 ARISTON_REMOTE: final = "remote"
@@ -19,6 +42,31 @@ ARISTON_PLANT_DATA: final = "plantData"
 ARISTON_REPORTS: final = "reports"
 ARISTON_TIME_PROGS: final = "timeProgs"
 
+ARISTON_ACCEPT_ENCODING: final = (
+    "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+)
+ARISTON_CONNECTION_LIMIT: final = 10
+ARISTON_DNS_CACHE_TTL: final = 300
+ARISTON_KEEPALIVE_TIMEOUT: final = 60
+ARISTON_TOKEN_LIFETIME: final = 1800
+ARISTON_TOKEN_REFRESH_MARGIN: final = 300
+ARISTON_RENEW_RETRY_BACKOFF: final = 30
+ARISTON_RENEW_MAX_BACKOFF: final = 900
+ARISTON_CONNECT_TIMEOUT: final = 10
+ARISTON_READ_TIMEOUT: final = 30
+ARISTON_PAYLOAD_CACHE_SIZE: final = 32
+ARISTON_RATE_LIMIT: final = 30
+ARISTON_RATE_BURST: final = 10
+ARISTON_MAX_CONCURRENT_REQUESTS: final = 4
+ARISTON_MAX_RETRIES: final = 3
+ARISTON_RETRY_BACKOFF: final = 1.0
+ARISTON_RETRY_MAX_BACKOFF: final = 30.0
+ARISTON_BREAKER_THRESHOLD: final = 5
+ARISTON_BREAKER_RESET_TIMEOUT: final = 60
+ARISTON_BREAKER_MAX_RESET_TIMEOUT: final = 900
+# The cloud can take a while to report a written value
+ARISTON_WRITE_CONFIRM_TIMEOUT: final = 180
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -46,6 +94,16 @@ class ZoneMode(IntFlag):
     TIME_PROGRAM = 3
 
 
+@unique
+class RequestPriority(IntFlag):
+    """Request priority enum, lower goes first"""
+
+    LOGIN = 0
+    WRITE = 1
+    POLL = 2
+    BACKGROUND = 3
+
+
 @unique
 class DhwMode(IntFlag):
     """Dhw mode enum"""
@@ -210,6 +268,19 @@ class ThermostatProperties:
     ZONE_DEROGA: final = "ZoneDeroga"
 
 
+def _get_property_names(properties: type) -> list[str]:
+    """Get the values of a property constants class"""
+    return [
+        getattr(properties, name)
+        for name in dir(properties)
+        if not name.startswith("__")
+    ]
+
+
+DEVICE_PROPERTIES: final = _get_property_names(DeviceProperties)
+THERMOSTAT_PROPERTIES: final = _get_property_names(ThermostatProperties)
+
+
 class ConsumptionProperties:
     """Constants for consumption properties"""
 
@@ -220,6 +291,14 @@ class ConsumptionProperties:
     GAS_COST: final = "gasCost"
 
 
+class EnergySource:
+    """Constants for the cloud endpoints of the energy data"""
+
+    CONSUMPTIONS_SEQUENCES: final = "consumptions sequences"
+    CONSUMPTIONS_SETTINGS: final = "consumptions settings"
+    ENERGY_ACCOUNT: final = "energy account"
+
+
 class PropertyType:
     """Constants for property types"""
 
@@ -235,30 +314,439 @@ class PropertyType:
     EXPIRES_ON: final = "expiresOn"
 
 
+class JsonCodec:
+    """Standard library JSON codec"""
+
+    name: final = "json"
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        """Encode to JSON bytes"""
+        return json.dumps(obj).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        """Decode from JSON bytes"""
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson based JSON codec"""
+
+    name: final = "orjson"
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        """Encode to JSON bytes"""
+        return orjson.dumps(obj)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        """Decode from JSON bytes"""
+        return orjson.loads(data)
+
+
+def get_default_json_codec() -> JsonCodec:
+    """Get the fastest installed JSON codec"""
+    return JsonCodec() if orjson is None else OrjsonCodec()
+
+
+class CircuitBreakerState:
+    """Constants for circuit breaker states"""
+
+    CLOSED: final = "closed"
+    OPEN: final = "open"
+    HALF_OPEN: final = "half_open"
+
+
+class AristonResponseError(Exception):
+    """Cloud answered with an unexpected status"""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        """Server side errors and throttling are worth a retry"""
+        return self.status >= 500 or self.status == 429
+
+
+class CircuitBreakerOpenError(Exception):
+    """Request rejected because the cloud keeps failing"""
+
+
+class CircuitBreaker:
+    """Stop calling the cloud after repeated failures and probe it later"""
+
+    def __init__(
+        self,
+        threshold: int = ARISTON_BREAKER_THRESHOLD,
+        reset_timeout: float = ARISTON_BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = ARISTON_BREAKER_MAX_RESET_TIMEOUT,
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = CircuitBreakerState.CLOSED
+        self.failures = 0
+        self.open_timeout = reset_timeout
+        self.opened_at: float = None
+        # A half open breaker lets only one request through at a time
+        self.probing = False
+
+    def before_request(self) -> None:
+        """Raise if the breaker is open, let a single probe through when it is time"""
+        if self.state == CircuitBreakerState.CLOSED:
+            return
+        if self.state == CircuitBreakerState.OPEN:
+            if time.monotonic() - self.opened_at < self.open_timeout:
+                raise CircuitBreakerOpenError(
+                    f"Ariston cloud unavailable, retry in {self.retry_in:.0f} s"
+                )
+            self.state = CircuitBreakerState.HALF_OPEN
+        elif self.probing:
+            raise CircuitBreakerOpenError(
+                "Ariston cloud unavailable, waiting for the probe request"
+            )
+        self.probing = True
+
+    def abort_request(self) -> None:
+        """A request ended without telling whether the cloud works"""
+        self.probing = False
+
+    def record_success(self) -> None:
+        """Close the breaker"""
+        self.probing = False
+        if self.state != CircuitBreakerState.CLOSED:
+            _LOGGER.info("Ariston cloud is available again")
+        self.state = CircuitBreakerState.CLOSED
+        self.failures = 0
+        self.open_timeout = self.reset_timeout
+
+    def record_failure(self) -> None:
+        """Open the breaker after too many failures, back off if a probe failed"""
+        self.probing = False
+        self.failures += 1
+        if self.state == CircuitBreakerState.HALF_OPEN:
+            self.open_timeout = min(self.open_timeout * 2, self.max_reset_timeout)
+        elif self.state == CircuitBreakerState.OPEN or self.failures < self.threshold:
+            return
+        _LOGGER.warning(
+            "Ariston cloud failed %s times, pausing requests for %s s",
+            self.failures,
+            self.open_timeout,
+        )
+        self.state = CircuitBreakerState.OPEN
+        self.opened_at = time.monotonic()
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state != CircuitBreakerState.OPEN:
+            return 0
+        return max(self.open_timeout - (time.monotonic() - self.opened_at), 0)
+
+    @property
+    def statistics(self) -> dict[str, Any]:
+        """Circuit breaker state"""
+        return {
+            "state": self.state,
+            "probing": self.probing,
+            "failures": self.failures,
+            "open_timeout": self.open_timeout,
+            "retry_in": self.retry_in,
+        }
+
+
+class RequestLimiter:
+    """Token bucket rate limiter with a concurrency cap, waiters served by priority"""
+
+    def __init__(
+        self,
+        rate_limit: float = ARISTON_RATE_LIMIT,
+        burst: int = ARISTON_RATE_BURST,
+        max_concurrent: int = ARISTON_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        self.rate = rate_limit / 60
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+
+        self.tokens = float(burst)
+        self.active = 0
+        self.__updated = time.monotonic()
+        self.__waiters: list[tuple[int, int, asyncio.Future]] = []
+        self.__sequence = itertools.count()
+        self.__wakeup: asyncio.TimerHandle = None
+
+    async def acquire(self, priority: RequestPriority) -> None:
+        """Wait for a free slot and a token"""
+        if not self.__waiters and self.__try_take():
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__waiters, (priority, next(self.__sequence), future))
+        # Grant it right away if possible, otherwise arm the refill wakeup
+        self.__dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted, but the caller is gone
+                self.release()
+            raise
+
+    def configure(self, rate_limit: float, burst: int, max_concurrent: int) -> None:
+        """Change the limits, queued requests get the new ones"""
+        # Tokens gathered so far were at the old rate
+        self.__refill()
+        self.rate = rate_limit / 60
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.tokens = min(self.tokens, burst)
+        if self.__wakeup is not None:
+            self.__wakeup.cancel()
+            self.__wakeup = None
+        self.__dispatch()
+
+    def release(self) -> None:
+        """Give back the slot of a finished request"""
+        self.active -= 1
+        self.__dispatch()
+
+    def __try_take(self) -> bool:
+        """Take a slot and a token if both are available"""
+        if self.active >= self.max_concurrent:
+            return False
+        self.__refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.active += 1
+        return True
+
+    def __refill(self) -> None:
+        """Add the tokens gained since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    def __dispatch(self) -> None:
+        """Wake up waiters in priority order while slots and tokens allow"""
+        while self.__waiters:
+            future = self.__waiters[0][2]
+            if future.done():
+                heapq.heappop(self.__waiters)
+                continue
+            if not self.__try_take():
+                break
+            heapq.heappop(self.__waiters)
+            future.set_result(None)
+
+        if (
+            self.__waiters
+            and self.active < self.max_concurrent
+            and self.__wakeup is None
+        ):
+            # Only the bucket is empty, come back when the next token is there
+            self.__wakeup = asyncio.get_running_loop().call_later(
+                (1 - self.tokens) / self.rate, self.__on_wakeup
+            )
+
+    def __on_wakeup(self) -> None:
+        self.__wakeup = None
+        self.__dispatch()
+
+    @property
+    def statistics(self) -> dict[str, Any]:
+        """Limiter state"""
+        return {
+            "tokens": self.tokens,
+            "active": self.active,
+            "queued": sum(not waiter[2].done() for waiter in self.__waiters),
+        }
+
+
 class AristonAPI:
     """Ariston API class"""
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        session: aiohttp.ClientSession = None,
+        token_lifetime: int = ARISTON_TOKEN_LIFETIME,
+        connect_timeout: float = ARISTON_CONNECT_TIMEOUT,
+        read_timeout: float = ARISTON_READ_TIMEOUT,
+        max_retries: int = ARISTON_MAX_RETRIES,
+        retry_backoff: float = ARISTON_RETRY_BACKOFF,
+        rate_limit: float = ARISTON_RATE_LIMIT,
+        max_concurrent_requests: int = ARISTON_MAX_CONCURRENT_REQUESTS,
+        json_codec: JsonCodec = None,
+    ) -> None:
         """Constructor for Ariston API."""
         self.__username = username
         self.__password = password
         self.__token = ""
+        self.__token_generation = 0
+        self.__token_time: float = None
+        self.__token_lifetime = token_lifetime
+        self.__login_lock = asyncio.Lock()
+        self.__renew_handle: asyncio.TimerHandle = None
+        self.__renew_task: asyncio.Task = None
+        self.__renew_failures = 0
+        self.token_refresh_count = 0
+        self.token_refresh_last_duration: float = None
+        self.token_refresh_total_duration = 0.0
+        self.__timeout = aiohttp.ClientTimeout(
+            connect=connect_timeout, sock_read=read_timeout
+        )
+        self.__max_retries = max_retries
+        self.__retry_backoff = retry_backoff
+        self.__json_codec = json_codec or get_default_json_codec()
+        self.__transfer_statistics: dict[str, dict[str, int]] = {}
+        self.__properties_payloads: dict[tuple, tuple[dict, bytes]] = {}
+        self.circuit_breaker = CircuitBreaker()
+        self.limiter = RequestLimiter(
+            rate_limit, min(ARISTON_RATE_BURST, rate_limit), max_concurrent_requests
+        )
+        self.__session = session
+        self.__owns_session = session is None
+
+    def configure(
+        self,
+        connect_timeout: float = ARISTON_CONNECT_TIMEOUT,
+        read_timeout: float = ARISTON_READ_TIMEOUT,
+        rate_limit: float = ARISTON_RATE_LIMIT,
+        max_concurrent_requests: int = ARISTON_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        """Change the request timeouts and limits of a client in use"""
+        self.__timeout = aiohttp.ClientTimeout(
+            connect=connect_timeout, sock_read=read_timeout
+        )
+        self.limiter.configure(
+            rate_limit, min(ARISTON_RATE_BURST, rate_limit), max_concurrent_requests
+        )
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session, create own one if none was given"""
+        if self.__session is None or (self.__owns_session and self.__session.closed):
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=ARISTON_CONNECTION_LIMIT,
+                    ttl_dns_cache=ARISTON_DNS_CACHE_TTL,
+                    keepalive_timeout=ARISTON_KEEPALIVE_TIMEOUT,
+                )
+            )
+            self.__owns_session = True
+        return self.__session
+
+    async def async_close(self) -> None:
+        """Stop token renewal and close the session if it is owned by the API"""
+        if self.__renew_handle is not None:
+            self.__renew_handle.cancel()
+            self.__renew_handle = None
+        if self.__renew_task is not None:
+            self.__renew_task.cancel()
+            self.__renew_task = None
+        if self.__owns_session and self.__session is not None:
+            await self.__session.close()
+        self.__session = None
 
     async def async_connect(self) -> bool:
         """Login to ariston cloud and get token"""
 
-        response = await self.post(
+        start = time.monotonic()
+
+        # The login request must not try to login again on 405
+        response = await self.__request(
+            "POST",
             f"{ARISTON_API_URL}{ARISTON_LOGIN}",
+            None,
             {"usr": self.__username, "pwd": self.__password},
+            True,
+            priority=RequestPriority.LOGIN,
         )
 
         if response is None:
             return False
 
         self.__token = response["token"]
+        self.__token_generation += 1
+        self.__token_time = time.monotonic()
+
+        self.token_refresh_count += 1
+        self.token_refresh_last_duration = self.__token_time - start
+        self.token_refresh_total_duration += self.token_refresh_last_duration
+        _LOGGER.debug("Token refreshed in %.3f s", self.token_refresh_last_duration)
+
+        self.__renew_failures = 0
+        self.__schedule_renew(
+            max(self.__token_lifetime - ARISTON_TOKEN_REFRESH_MARGIN, 0)
+        )
 
         return True
 
+    def __schedule_renew(self, delay: float) -> None:
+        """Schedule the background login"""
+        if self.__renew_handle is not None:
+            self.__renew_handle.cancel()
+        self.__renew_handle = asyncio.get_running_loop().call_later(
+            delay, self.__start_renew
+        )
+
+    def __start_renew(self) -> None:
+        """Start the background login, requests keep using the current token"""
+        self.__renew_handle = None
+        if self.__renew_task is None or self.__renew_task.done():
+            self.__renew_task = asyncio.create_task(self.__async_renew())
+
+    async def __async_renew(self) -> None:
+        """Renew the token in the background"""
+        try:
+            if await self.__async_refresh_token(self.__token_generation):
+                return
+            _LOGGER.warning("Background token renewal failed")
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Background token renewal failed")
+
+        # Try again before a user request has to login, not before the breaker allows
+        delay = max(
+            min(
+                ARISTON_RENEW_RETRY_BACKOFF * 2**self.__renew_failures,
+                ARISTON_RENEW_MAX_BACKOFF,
+            ),
+            self.circuit_breaker.retry_in,
+        )
+        self.__renew_failures += 1
+        _LOGGER.debug("Next background token renewal in %.0f s", delay)
+        self.__schedule_renew(delay)
+
+    @property
+    def token_statistics(self) -> dict[str, Any]:
+        """Token age and refresh timings"""
+        return {
+            "age": None
+            if self.__token_time is None
+            else time.monotonic() - self.__token_time,
+            "lifetime": self.__token_lifetime,
+            "renew_failures": self.__renew_failures,
+            "refresh_count": self.token_refresh_count,
+            "refresh_last_duration": self.token_refresh_last_duration,
+            "refresh_average_duration": self.token_refresh_total_duration
+            / self.token_refresh_count
+            if self.token_refresh_count
+            else None,
+        }
+
+    async def __async_refresh_token(self, generation: int) -> bool:
+        """Login again, unless an other request already did it since generation"""
+        async with self.__login_lock:
+            if self.__token_generation != generation:
+                return True
+            return await self.async_connect()
+
     async def async_get_detailed_devices(self) -> dict[str, Any]:
         """Get detailed cloud devices"""
         return await self.get(f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_PLANTS}")
@@ -278,7 +766,8 @@ class AristonAPI:
     async def async_get_energy_account(self, gw_id: str) -> dict[str, Any]:
         """Get energy account for the device"""
         return await self.get(
-            f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_REPORTS}/{gw_id}/energyAccount"
+            f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_REPORTS}/{gw_id}/energyAccount",
+            priority=RequestPriority.BACKGROUND,
         )
 
     async def async_get_consumptions_sequences(
@@ -286,7 +775,8 @@ class AristonAPI:
     ) -> dict[str, Any]:
         """Get consumption sequences for the device"""
         return await self.get(
-            f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_REPORTS}/{gw_id}/consSequencesApi8?usages=Ch{'%2CDhw' if has_boiler else ''}&hasSlp={has_slp}"
+            f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_REPORTS}/{gw_id}/consSequencesApi8?usages=Ch{'%2CDhw' if has_boiler else ''}&hasSlp={has_slp}",
+            priority=RequestPriority.BACKGROUND,
         )
 
     async def async_get_consumptions_settings(self, gw_id: str) -> dict[str, Any]:
@@ -294,6 +784,8 @@ class AristonAPI:
         return await self.post(
             f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_PLANTS}/{gw_id}/getConsumptionsSettings",
             {},
+            idempotent=True,
+            priority=RequestPriority.BACKGROUND,
         )
 
     async def async_set_consumptions_settings(
@@ -305,43 +797,65 @@ class AristonAPI:
         return await self.post(
             f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_PLANTS}/{gw_id}/consumptionsSettings",
             consumptions_settings,
+            priority=RequestPriority.WRITE,
         )
 
     @staticmethod
-    def get_items(features: dict[str, Any]):
-        """Get the final strings from DeviceProperies and ThermostatProperties"""
-        device_props = [
-            getattr(DeviceProperties, device_property)
-            for device_property in dir(DeviceProperties)
-            if not device_property.startswith("__")
-        ]
-        thermostat_props = [
-            getattr(ThermostatProperties, thermostat_properties)
-            for thermostat_properties in dir(ThermostatProperties)
-            if not thermostat_properties.startswith("__")
-        ]
-
-        items = []
-        for device_prop in device_props:
-            items.append({"id": device_prop, "zn": 0})
+    def get_item_keys(features: dict[str, Any]) -> list[tuple[str, int]]:
+        """Get every (item id, zone) pair of DeviceProperies and ThermostatProperties"""
+        item_keys = [(device_prop, 0) for device_prop in DEVICE_PROPERTIES]
 
         for zone in features[DeviceFeatures.ZONES]:
-            for thermostat_prop in thermostat_props:
-                items.append({"id": thermostat_prop, "zn": zone[ZoneAttribute.NUM]})
-        return items
+            for thermostat_prop in THERMOSTAT_PROPERTIES:
+                item_keys.append((thermostat_prop, zone[ZoneAttribute.NUM]))
+        return item_keys
+
+    @staticmethod
+    def get_items(
+        features: dict[str, Any], item_keys: tuple[tuple[str, int], ...] = None
+    ):
+        """Get the final strings from DeviceProperies and ThermostatProperties"""
+        if item_keys is None:
+            item_keys = AristonAPI.get_item_keys(features)
+        return [{"id": item_id, "zn": zone} for item_id, zone in item_keys]
+
+    def __get_properties_payload(
+        self,
+        gw_id: str,
+        features: dict[str, Any],
+        culture: str,
+        item_keys: tuple[tuple[str, int], ...],
+    ) -> bytes:
+        """Get the encoded dataItems request, built once for the features and items"""
+        cache_key = (gw_id, culture, item_keys)
+        cached = self.__properties_payloads.get(cache_key)
+        if cached is None or cached[0] is not features:
+            if len(self.__properties_payloads) >= ARISTON_PAYLOAD_CACHE_SIZE:
+                self.__properties_payloads.clear()
+            payload = self.__json_codec.dumps(
+                {
+                    "items": self.get_items(features, item_keys),
+                    "features": features,
+                    "culture": culture,
+                }
+            )
+            cached = self.__properties_payloads[cache_key] = (features, payload)
+        return cached[1]
 
     async def async_get_properties(
-        self, gw_id: str, features: dict[str, Any], culture: str, umsys: str
+        self,
+        gw_id: str,
+        features: dict[str, Any],
+        culture: str,
+        umsys: str,
+        item_keys: tuple[tuple[str, int], ...] = None,
     ) -> dict[str, Any]:
-        """Get device properties"""
+        """Get device properties, all of them if no item keys are given"""
 
         return await self.post(
             f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_DATA_ITEMS}/{gw_id}/get?umsys={umsys}",
-            {
-                "items": self.get_items(features),
-                "features": features,
-                "culture": culture,
-            },
+            self.__get_properties_payload(gw_id, features, culture, item_keys),
+            idempotent=True,
         )
 
     async def async_set_property(
@@ -355,6 +869,21 @@ class AristonAPI:
         umsys: str,
     ) -> dict[str, Any]:
         """Set device properties"""
+        return await self.async_set_properties(
+            gw_id,
+            features,
+            [(device_property, zone_id, value, prev_value)],
+            umsys,
+        )
+
+    async def async_set_properties(
+        self,
+        gw_id: str,
+        features: dict[str, Any],
+        properties: list[tuple[str, int, float, float]],
+        umsys: str,
+    ) -> dict[str, Any]:
+        """Set several (property, zone, value, previous value) in one request"""
         return await self.post(
             f"{ARISTON_API_URL}{ARISTON_REMOTE}/{ARISTON_DATA_ITEMS}/{gw_id}/set?umsys={umsys}",
             {
@@ -365,9 +894,11 @@ class AristonAPI:
                         "value": value,
                         "zone": zone_id,
                     }
+                    for device_property, zone_id, value, prev_value in properties
                 ],
                 "features": features,
             },
+            priority=RequestPriority.WRITE,
         )
 
     async def async_get_thermostat_time_progs(
@@ -390,6 +921,7 @@ class AristonAPI:
             {
                 "new": holiday_end_date,
             },
+            priority=RequestPriority.WRITE,
         )
 
     async def __request(
@@ -397,9 +929,12 @@ class AristonAPI:
         method: str,
         path: str,
         params: dict[str, Any] = None,
-        body: dict[str, Any] = None,
+        body: dict[str, Any] or bytes = None,
         is_retry: bool = False,
+        idempotent: bool = False,
+        priority: RequestPriority = RequestPriority.POLL,
     ) -> dict[str, Any]:
+        generation = self.__token_generation
         headers = {"ar.authToken": self.__token}
 
         _LOGGER.debug(
@@ -410,35 +945,167 @@ class AristonAPI:
             body,
         )
 
-        async with aiohttp.ClientSession() as session:
-            response = await session.request(
-                method, path, params=params, json=body, headers=headers
-            )
+        attempts = self.__max_retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            self.circuit_breaker.before_request()
+            try:
+                token_valid, response_json = await self.__async_send(
+                    method, path, params, body, headers, priority
+                )
+            except AristonResponseError as error:
+                if not error.retryable:
+                    # The cloud answered, only the request was refused
+                    self.circuit_breaker.record_success()
+                    raise
+                await self.__async_handle_failure(path, error, attempt, attempts)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                await self.__async_handle_failure(path, error, attempt, attempts)
+            except BaseException:
+                self.circuit_breaker.abort_request()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                break
+
+        if token_valid:
+            return response_json
+
+        # Token expired, the connection is released before logging in again.
+        # Concurrent requests share one login and retry with the new token.
+        if not is_retry:
+            if await self.__async_refresh_token(generation):
+                return await self.__request(
+                    method, path, params, body, True, idempotent, priority
+                )
+            raise Exception("Login failed (password changed?)")
+        raise Exception("Invalid token")
+
+    async def __async_handle_failure(
+        self, path: str, error: Exception, attempt: int, attempts: int
+    ) -> None:
+        """Count the failure, raise it on the last attempt or wait with backoff"""
+        self.circuit_breaker.record_failure()
+        if attempt + 1 >= attempts:
+            raise error
+        # Full jitter, so retries of concurrent requests do not come in waves
+        delay = random.uniform(
+            0, min(self.__retry_backoff * 2**attempt, ARISTON_RETRY_MAX_BACKOFF)
+        )
+        _LOGGER.debug("Request %s failed (%s), retry in %.1f s", path, error, delay)
+        await asyncio.sleep(delay)
+
+    async def __async_send(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        body: dict[str, Any] or bytes,
+        headers: dict[str, str],
+        priority: RequestPriority,
+    ) -> tuple[bool, dict[str, Any]]:
+        """Send one request, return whether the token was accepted and the response"""
+        await self.limiter.acquire(priority)
+        try:
+            return await self.__async_send_now(method, path, params, body, headers)
+        finally:
+            self.limiter.release()
+
+    async def __async_send_now(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        body: dict[str, Any] or bytes,
+        headers: dict[str, str],
+    ) -> tuple[bool, dict[str, Any]]:
+        """Send one request without waiting for the limiter"""
+        session = self.__get_session()
+        headers = {**headers, "Accept-Encoding": ARISTON_ACCEPT_ENCODING}
+        if body is not None:
+            if not isinstance(body, bytes):
+                body = self.__json_codec.dumps(body)
+            headers["Content-Type"] = "application/json"
+        async with session.request(
+            method,
+            path,
+            params=params,
+            data=body,
+            headers=headers,
+            timeout=self.__timeout,
+        ) as response:
+            if response.status == 405:
+                return False, None
 
             if not response.ok:
-                if response.status == 405:
-                    if not is_retry:
-                        if await self.async_connect():
-                            return await self.__request(
-                                method, path, params, body, True
-                            )
-                        raise Exception("Login failed (password changed?)")
-                    raise Exception("Invalid token")
                 if response.status == 404:
-                    return None
-                raise Exception(response.status)
+                    return True, None
+                raise AristonResponseError(response.status)
+
+            # Content length is None for chunked replies, and aiohttp
+            # decompresses the body, so the read bytes are always the decoded ones
+            raw = await response.read()
+            self.__record_transfer(path, response, len(raw))
+            if not raw:
+                return True, None
+
+            _LOGGER.debug("Response %s", raw)
+            return True, self.__json_codec.loads(raw)
 
-            if response.content_length > 0:
-                json = await response.json()
-                _LOGGER.debug("Response %s", json)
-                return json
+    def __record_transfer(
+        self, path: str, response: aiohttp.ClientResponse, decoded_size: int
+    ) -> None:
+        """Count the bytes on the wire and the decoded bytes for the endpoint"""
+        endpoint = path.split("?", 1)[0].replace(ARISTON_API_URL, "", 1)
+        statistics = self.__transfer_statistics.setdefault(
+            endpoint,
+            {
+                "requests": 0,
+                "compressed": 0,
+                "wire_bytes": 0,
+                "decoded_bytes": 0,
+                "unknown_wire_size": 0,
+            },
+        )
 
-            return None
+        encoding = response.headers.get(aiohttp.hdrs.CONTENT_ENCODING, "identity")
+        if encoding != "identity":
+            statistics["compressed"] += 1
 
-    async def post(self, path: str, body: dict[str, Any] = None) -> dict[str, Any]:
+        # Wire size of compressed chunked replies is not known after decoding
+        if response.content_length is not None:
+            statistics["wire_bytes"] += response.content_length
+        elif encoding == "identity":
+            statistics["wire_bytes"] += decoded_size
+        else:
+            statistics["unknown_wire_size"] += 1
+
+        statistics["requests"] += 1
+        statistics["decoded_bytes"] += decoded_size
+
+    @property
+    def transfer_statistics(self) -> dict[str, dict[str, int]]:
+        """Bytes on the wire and decoded bytes by endpoint"""
+        return self.__transfer_statistics
+
+    async def post(
+        self,
+        path: str,
+        body: dict[str, Any] or bytes = None,
+        idempotent: bool = False,
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> dict[str, Any]:
         """POST request"""
-        return await self.__request("POST", path, None, body)
+        return await self.__request(
+            "POST", path, None, body, idempotent=idempotent, priority=priority
+        )
 
-    async def get(self, path: str, params: dict[str, Any] = None) -> dict[str, Any]:
+    async def get(
+        self,
+        path: str,
+        params: dict[str, Any] = None,
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> dict[str, Any]:
         """GET request"""
-        return await self.__request("GET", path, params, None)
+        return await self.__request(
+            "GET", path, params, None, idempotent=True, priority=priority
+        )
@@ -84,6 +84,19 @@ class AristonBoiler(AristonEntity, ClimateEntity):
             f"{self.coordinator.device.attributes[DeviceAttribute.GW_ID]}_{self.zone}"
         )
 
+    @property
+    def item_keys(self) -> set[tuple[str, int]]:
+        """Items of the device the state of the entity depends on"""
+        return {
+            (DeviceProperties.PLANT_MODE, 0),
+            (DeviceProperties.IS_FLAME_ON, 0),
+            (ThermostatProperties.ZONE_MEASURED_TEMP, self.zone),
+            (ThermostatProperties.ZONE_COMFORT_TEMP, self.zone),
+            (ThermostatProperties.ZONE_MODE, self.zone),
+            (ThermostatProperties.ZONE_HEAT_REQUEST, self.zone),
+            (ThermostatProperties.ZONE_ECONOMY_TEMP, self.zone),
+        }
+
     @property
     def icon(self):
         """Return the name of the Climate device."""
@@ -266,15 +279,13 @@ class AristonBoiler(AristonEntity, ClimateEntity):
             )
         )
 
+        # Plant and zone mode changes go to the cloud in one request
+        changes: list[tuple[str, int, int]] = []
         if hvac_mode == HVAC_MODE_OFF:
             if PlantMode.OFF in plant_modes:
-                await self.coordinator.device.async_set_item_by_id(
-                    DeviceProperties.PLANT_MODE, PlantMode.OFF
-                )
+                changes.append((DeviceProperties.PLANT_MODE, PlantMode.OFF, 0))
             else:
-                await self.coordinator.device.async_set_item_by_id(
-                    DeviceProperties.PLANT_MODE, PlantMode.SUMMER
-                )
+                changes.append((DeviceProperties.PLANT_MODE, PlantMode.SUMMER, 0))
         elif hvac_mode == HVAC_MODE_AUTO:
             if current_plant_mode in [
                 PlantMode.WINTER,
@@ -285,21 +296,17 @@ class AristonBoiler(AristonEntity, ClimateEntity):
                 pass
             elif current_plant_mode == PlantMode.SUMMER:
                 # DHW is working, so use Winter where CH and DHW are active
-                await self.coordinator.device.async_set_item_by_id(
-                    DeviceProperties.PLANT_MODE, PlantMode.WINTER
-                )
+                changes.append((DeviceProperties.PLANT_MODE, PlantMode.WINTER, 0))
             else:
                 # hvac is OFF, so use heating only, if not supported then winter
                 if PlantMode.HEATING_ONLY in plant_modes:
-                    await self.coordinator.device.async_set_item_by_id(
-                        DeviceProperties.PLANT_MODE, PlantMode.HEATING_ONLY
+                    changes.append(
+                        (DeviceProperties.PLANT_MODE, PlantMode.HEATING_ONLY, 0)
                     )
                 else:
-                    await self.coordinator.device.async_set_item_by_id(
-                        DeviceProperties.PLANT_MODE, PlantMode.WINTER
-                    )
-            await self.coordinator.device.async_set_item_by_id(
-                ThermostatProperties.ZONE_MODE, ZoneMode.TIME_PROGRAM, self.zone
+                    changes.append((DeviceProperties.PLANT_MODE, PlantMode.WINTER, 0))
+            changes.append(
+                (ThermostatProperties.ZONE_MODE, ZoneMode.TIME_PROGRAM, self.zone)
             )
         elif hvac_mode == HVAC_MODE_HEAT:
             if current_plant_mode in [PlantMode.WINTER, PlantMode.HEATING_ONLY]:
@@ -307,39 +314,35 @@ class AristonBoiler(AristonEntity, ClimateEntity):
                 pass
             elif current_plant_mode in [PlantMode.SUMMER, PlantMode.COOLING]:
                 # DHW is working, so use Winter and change mode
-                await self.coordinator.device.async_set_item_by_id(
-                    DeviceProperties.PLANT_MODE, PlantMode.WINTER
-                )
+                changes.append((DeviceProperties.PLANT_MODE, PlantMode.WINTER, 0))
             else:
                 # hvac is OFF, so use heating only, if not supported then winter
                 if PlantMode.HEATING_ONLY in plant_modes:
-                    await self.coordinator.device.async_set_item_by_id(
-                        DeviceProperties.PLANT_MODE, PlantMode.HEATING_ONLY
+                    changes.append(
+                        (DeviceProperties.PLANT_MODE, PlantMode.HEATING_ONLY, 0)
                     )
                 else:
-                    await self.coordinator.device.async_set_item_by_id(
-                        DeviceProperties.PLANT_MODE, PlantMode.WINTER
-                    )
+                    changes.append((DeviceProperties.PLANT_MODE, PlantMode.WINTER, 0))
             if ZoneMode.MANUAL2 in zone_modes:
-                await self.coordinator.device.async_set_item_by_id(
-                    ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL2, self.zone
+                changes.append(
+                    (ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL2, self.zone)
                 )
             else:
-                await self.coordinator.device.async_set_item_by_id(
-                    ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL, self.zone
+                changes.append(
+                    (ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL, self.zone)
                 )
         elif hvac_mode == HVAC_MODE_COOL:
-            await self.coordinator.device.async_set_item_by_id(
-                DeviceProperties.PLANT_MODE, PlantMode.COOLING
-            )
+            changes.append((DeviceProperties.PLANT_MODE, PlantMode.COOLING, 0))
             if ZoneMode.MANUAL2 in zone_modes:
-                await self.coordinator.device.async_set_item_by_id(
-                    ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL2, self.zone
+                changes.append(
+                    (ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL2, self.zone)
                 )
             else:
-                await self.coordinator.device.async_set_item_by_id(
-                    ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL, self.zone
+                changes.append(
+                    (ThermostatProperties.ZONE_MODE, ZoneMode.MANUAL, self.zone)
                 )
+        if changes:
+            await self.coordinator.device.async_set_items_by_id(changes)
         self.async_write_ha_state()
 
     async def async_set_preset_mode(self, preset_mode):
@@ -372,7 +375,9 @@ class AristonBoiler(AristonEntity, ClimateEntity):
             self.name,
         )
 
-        await self.coordinator.device.async_set_item_by_id(
+        # Slider changes are coalesced, show the new value until it is sent
+        write = self.coordinator.device.set_item_by_id_debounced(
             ThermostatProperties.ZONE_COMFORT_TEMP, temperature, self.zone
         )
         self.async_write_ha_state()
+        await write
@@ -15,14 +15,35 @@ from homeassistant.const import (
 )
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
+    ADAPTIVE_SCAN_INTERVAL,
+    CONNECT_TIMEOUT,
+    DEFAULT_ADAPTIVE_SCAN_INTERVAL,
+    DEFAULT_CONNECT_TIMEOUT_SECONDS,
     DEFAULT_ENERGY_SCAN_INTERVAL_MINUTES,
     DEFAULT_EXTRA_ENERGY_FEATURES,
+    DEFAULT_FAST_SCAN_INTERVAL_SECONDS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_SCAN_INTERVAL_SECONDS,
+    DEFAULT_MIN_SCAN_INTERVAL_SECONDS,
+    DEFAULT_RATE_LIMIT_PER_MINUTE,
+    DEFAULT_READ_TIMEOUT_SECONDS,
     DEFAULT_SCAN_INTERVAL_SECONDS,
+    DEFAULT_UPDATE_DEADLINE_SECONDS,
+    DEFAULT_WRITE_DEBOUNCE_MILLISECONDS,
     DOMAIN,
     ENERGY_SCAN_INTERVAL,
     EXTRA_ENERGY_FEATURES,
+    FAST_SCAN_INTERVAL,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    RATE_LIMIT,
+    READ_TIMEOUT,
+    UPDATE_DEADLINE,
+    WRITE_DEBOUNCE,
 )
 from .ariston import AristonAPI, DeviceAttribute
 
@@ -61,7 +82,11 @@ class AristonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         try:
             self.cloud_username = user_input[CONF_USERNAME]
             self.cloud_password = user_input[CONF_PASSWORD]
-            self.api = AristonAPI(self.cloud_username, self.cloud_password)
+            self.api = AristonAPI(
+                self.cloud_username,
+                self.cloud_password,
+                async_get_clientsession(self.hass),
+            )
             response = await self.api.async_connect()
             if not response:
                 errors["base"] = "invalid_auth"
@@ -70,6 +95,8 @@ class AristonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors["base"] = "unknown"
         else:
             cloud_devices = await self.api.async_get_devices()
+            # Only the device list is needed, stop the token renewal
+            await self.api.async_close()
             if len(cloud_devices) == 1:
                 cloud_device = cloud_devices[0]
                 existing_entry = await self.async_set_unique_id(
@@ -149,9 +176,31 @@ class AristonOptionsFlow(config_entries.OptionsFlow):
             EXTRA_ENERGY_FEATURES, DEFAULT_EXTRA_ENERGY_FEATURES
         )
         scan_interval = options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL_SECONDS)
+        fast_scan_interval = options.get(
+            FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL_SECONDS
+        )
+        adaptive_scan_interval = options.get(
+            ADAPTIVE_SCAN_INTERVAL, DEFAULT_ADAPTIVE_SCAN_INTERVAL
+        )
+        min_scan_interval = options.get(
+            MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL_SECONDS
+        )
+        max_scan_interval = options.get(
+            MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL_SECONDS
+        )
         energy_scan_interval = options.get(
             ENERGY_SCAN_INTERVAL, DEFAULT_ENERGY_SCAN_INTERVAL_MINUTES
         )
+        connect_timeout = options.get(CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT_SECONDS)
+        read_timeout = options.get(READ_TIMEOUT, DEFAULT_READ_TIMEOUT_SECONDS)
+        update_deadline = options.get(UPDATE_DEADLINE, DEFAULT_UPDATE_DEADLINE_SECONDS)
+        rate_limit = options.get(RATE_LIMIT, DEFAULT_RATE_LIMIT_PER_MINUTE)
+        max_concurrent_requests = options.get(
+            MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        write_debounce = options.get(
+            WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE_MILLISECONDS
+        )
 
         return self.async_show_form(
             step_id="init",
@@ -165,10 +214,50 @@ class AristonOptionsFlow(config_entries.OptionsFlow):
                         CONF_SCAN_INTERVAL,
                         default=scan_interval,
                     ): int,
+                    vol.Optional(
+                        FAST_SCAN_INTERVAL,
+                        default=fast_scan_interval,
+                    ): int,
+                    vol.Optional(
+                        ADAPTIVE_SCAN_INTERVAL,
+                        default=adaptive_scan_interval,
+                    ): bool,
+                    vol.Optional(
+                        MIN_SCAN_INTERVAL,
+                        default=min_scan_interval,
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        MAX_SCAN_INTERVAL,
+                        default=max_scan_interval,
+                    ): vol.All(int, vol.Range(min=1)),
                     vol.Optional(
                         ENERGY_SCAN_INTERVAL,
                         default=energy_scan_interval,
                     ): int,
+                    vol.Optional(
+                        CONNECT_TIMEOUT,
+                        default=connect_timeout,
+                    ): int,
+                    vol.Optional(
+                        READ_TIMEOUT,
+                        default=read_timeout,
+                    ): int,
+                    vol.Optional(
+                        UPDATE_DEADLINE,
+                        default=update_deadline,
+                    ): int,
+                    vol.Optional(
+                        RATE_LIMIT,
+                        default=rate_limit,
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        MAX_CONCURRENT_REQUESTS,
+                        default=max_concurrent_requests,
+                    ): vol.All(int, vol.Range(min=1)),
+                    vol.Optional(
+                        WRITE_DEBOUNCE,
+                        default=write_debounce,
+                    ): vol.All(int, vol.Range(min=0)),
                 }
             ),
             last_step=True,
@@ -23,6 +23,7 @@ from .ariston import (
     Currency,
     DeviceFeatures,
     DeviceProperties,
+    EnergySource,
     GasEnergyUnit,
     GasType,
     PropertyType,
@@ -32,19 +33,91 @@ from .ariston import (
 
 DOMAIN: final = "ariston"
 NAME: final = "Ariston"
+API: final = "api"
+API_CLIENTS: final = "api_clients"
+API_ENTRIES: final = "api_entries"
+API_LOGIN: final = "api_login"
+API_OPTIONS: final = "api_options"
 COORDINATOR: final = "coordinator"
 ENERGY_COORDINATOR: final = "energy_coordinator"
 ENERGY_SCAN_INTERVAL: final = "energy_scan_interval"
+FAST_SCAN_INTERVAL: final = "fast_scan_interval"
+ADAPTIVE_SCAN_INTERVAL: final = "adaptive_scan_interval"
+MIN_SCAN_INTERVAL: final = "min_scan_interval"
+MAX_SCAN_INTERVAL: final = "max_scan_interval"
 EXTRA_ENERGY_FEATURES: final = "extra_energy_features"
+CONNECT_TIMEOUT: final = "connect_timeout"
+READ_TIMEOUT: final = "read_timeout"
+UPDATE_DEADLINE: final = "update_deadline"
+RATE_LIMIT: final = "rate_limit"
+MAX_CONCURRENT_REQUESTS: final = "max_concurrent_requests"
+WRITE_DEBOUNCE: final = "write_debounce"
 
 DEFAULT_SCAN_INTERVAL_SECONDS: final = 60
+DEFAULT_FAST_SCAN_INTERVAL_SECONDS: final = 60
+STATIC_SCAN_INTERVAL_MINUTES: final = 30
+DEFAULT_ADAPTIVE_SCAN_INTERVAL: final = False
+DEFAULT_MIN_SCAN_INTERVAL_SECONDS: final = 20
+DEFAULT_MAX_SCAN_INTERVAL_SECONDS: final = 600
 DEFAULT_ENERGY_SCAN_INTERVAL_MINUTES: final = 60
+# Consumption sequences get a new bucket every two hours of local time
+ENERGY_BOUNDARY_HOURS: final = 2
+ENERGY_BOUNDARY_GRACE_MINUTES: final = 5
+ENERGY_CONFIRM_RETRY_MINUTES: final = 5
+ENERGY_CONFIRM_RETRIES: final = 3
+# Long sequences imported into statistics, p=3: 15*2 days p=4: 12 months
+STATISTICS_PERIODS: final = {3, 4}
+# Short sequences telling when the cloud published new buckets, p=1 first
+STATISTICS_ANCHOR_PERIODS: final = (1, 2)
+# Longest wait for a sequence to match the last imported bucket
+STATISTICS_MAX_HOLD_HOURS: final = 24
+STATISTICS_STORAGE_KEY: final = f"{DOMAIN}_statistics"
+STATISTICS_STORAGE_VERSION: final = 1
 DEFAULT_EXTRA_ENERGY_FEATURES: final = False
+DEFAULT_CONNECT_TIMEOUT_SECONDS: final = 10
+DEFAULT_READ_TIMEOUT_SECONDS: final = 30
+DEFAULT_UPDATE_DEADLINE_SECONDS: final = 60
+DEFAULT_RATE_LIMIT_PER_MINUTE: final = 30
+DEFAULT_MAX_CONCURRENT_REQUESTS: final = 4
+DEFAULT_WRITE_DEBOUNCE_MILLISECONDS: final = 1000
+MAX_SCAN_INTERVAL_SLOWDOWN: final = 16
+# Re-reads of written items until the cloud reports the new values
+WRITE_CONFIRM_DELAYS_SECONDS: final = (2, 4, 8, 16, 30)
+
+
+class ItemTier:
+    """Constants for item polling tiers"""
+
+    FAST: final = "fast"
+    NORMAL: final = "normal"
+    STATIC: final = "static"
+
+
+# Measurements that change all the time
+FAST_ITEMS: final = {
+    DeviceProperties.IS_FLAME_ON,
+    DeviceProperties.OUTSIDE_TEMP,
+    DeviceProperties.HEATING_CIRCUIT_PRESSURE,
+    DeviceProperties.CH_FLOW_SETPOINT_TEMP,
+    DeviceProperties.DHW_TEMP,
+    ThermostatProperties.ZONE_MEASURED_TEMP,
+    ThermostatProperties.ZONE_DESIRED_TEMP,
+    ThermostatProperties.ZONE_HEAT_REQUEST,
+}
+
+# Settings that are almost never changed
+STATIC_ITEMS: final = {
+    DeviceProperties.AUTOMATIC_THERMOREGULATION,
+    DeviceProperties.ANTILEGIONELLA_ON_OFF,
+    DeviceProperties.ANTILEGIONELLA_TEMP,
+    DeviceProperties.ANTILEGIONELLA_FREQ,
+}
 
 ATTR_TARGET_TEMP_STEP = "target_temp_step"
 ATTR_HEAT_REQUEST = "heat_request"
 ATTR_ECONOMY_TEMP = "economy_temp"
 ATTR_HOLIDAY = "holiday"
+ATTR_STALE = "stale"
 
 
 @dataclass
@@ -58,6 +131,7 @@ class AristonBaseEntityDescription(EntityDescription, ABC):
         dict["Property":str], dict["Type":str], dict["Zone":int], dict["Attribute":str]
     ] or None = None
     zone: int = 0
+    energy_source: str or None = None
 
 
 @dataclass
@@ -199,6 +273,7 @@ ARISTON_NUMBER_TYPES: tuple[AristonNumberEntityDescription, ...] = (
         # step=0.01,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SETTINGS,
         extra_energy_feature=True,
     ),
     AristonNumberEntityDescription(
@@ -212,6 +287,7 @@ ARISTON_NUMBER_TYPES: tuple[AristonNumberEntityDescription, ...] = (
         # step=0.01,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SETTINGS,
         extra_energy_feature=True,
     ),
 )
@@ -227,6 +303,7 @@ ARISTON_SELECT_TYPES: tuple[AristonSelectEntityDescription, ...] = (
         enum_class=Currency,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SETTINGS,
         extra_energy_feature=True,
     ),
     AristonSelectEntityDescription(
@@ -237,6 +314,7 @@ ARISTON_SELECT_TYPES: tuple[AristonSelectEntityDescription, ...] = (
         enum_class=GasType,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SETTINGS,
         extra_energy_feature=True,
     ),
     AristonSelectEntityDescription(
@@ -247,6 +325,7 @@ ARISTON_SELECT_TYPES: tuple[AristonSelectEntityDescription, ...] = (
         enum_class=GasEnergyUnit,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SETTINGS,
         extra_energy_feature=True,
     ),
 )
@@ -255,7 +334,7 @@ ARISTON_GAS_CONSUMPTION_LAST_TWO_HOURS_TYPE: tuple[
     AristonSensorEntityDescription, ...
 ] = (
     AristonSensorEntityDescription(
-        key="0",
+        key="1|1",
         name=f"{NAME} gas consumption for heating last two hours",
         icon="mdi:cash",
         entity_category=EntityCategory.DIAGNOSTIC,
@@ -264,9 +343,10 @@ ARISTON_GAS_CONSUMPTION_LAST_TWO_HOURS_TYPE: tuple[
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
     ),
     AristonSensorEntityDescription(
-        key="4",
+        key="2|1",
         name=f"{NAME} gas consumption for water last two hours",
         icon="mdi:cash",
         entity_category=EntityCategory.DIAGNOSTIC,
@@ -275,6 +355,7 @@ ARISTON_GAS_CONSUMPTION_LAST_TWO_HOURS_TYPE: tuple[
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_features={DeviceFeatures.HAS_METERING, DeviceFeatures.HAS_BOILER},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
     ),
 )
 
@@ -290,6 +371,7 @@ ARISTON_CONSUMPTION_LAST_MONTH_SENSORS_TYPES: tuple[
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.ENERGY_ACCOUNT,
         extra_energy_feature=True,
     ),
     AristonSensorEntityDescription(
@@ -301,6 +383,7 @@ ARISTON_CONSUMPTION_LAST_MONTH_SENSORS_TYPES: tuple[
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_features={DeviceFeatures.HAS_METERING},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.ENERGY_ACCOUNT,
         extra_energy_feature=True,
     ),
     AristonSensorEntityDescription(
@@ -312,6 +395,7 @@ ARISTON_CONSUMPTION_LAST_MONTH_SENSORS_TYPES: tuple[
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_features={DeviceFeatures.HAS_METERING, DeviceFeatures.HAS_BOILER},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.ENERGY_ACCOUNT,
         extra_energy_feature=True,
     ),
     AristonSensorEntityDescription(
@@ -323,6 +407,80 @@ ARISTON_CONSUMPTION_LAST_MONTH_SENSORS_TYPES: tuple[
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_features={DeviceFeatures.HAS_METERING, DeviceFeatures.HAS_BOILER},
         coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.ENERGY_ACCOUNT,
         extra_energy_feature=True,
     ),
 )
+
+# Key: k|p|buckets, each sensor sums its whole sequence of 12 * 2 hours,
+# 7 days or 12 months, the buckets count keeps shorter sums possible
+ARISTON_CONSUMPTION_ROLLING_SUM_SENSORS_TYPES: tuple[
+    AristonSensorEntityDescription, ...
+] = (
+    AristonSensorEntityDescription(
+        key="1|1|12",
+        name=f"{NAME} gas consumption for heating last 24 hours",
+        icon="mdi:cash",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_features={DeviceFeatures.HAS_METERING},
+        coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
+    ),
+    AristonSensorEntityDescription(
+        key="1|2|7",
+        name=f"{NAME} gas consumption for heating last 7 days",
+        icon="mdi:cash",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_features={DeviceFeatures.HAS_METERING},
+        coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
+    ),
+    AristonSensorEntityDescription(
+        key="1|4|12",
+        name=f"{NAME} gas consumption for heating last 12 months",
+        icon="mdi:cash",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_features={DeviceFeatures.HAS_METERING},
+        coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
+    ),
+    AristonSensorEntityDescription(
+        key="2|1|12",
+        name=f"{NAME} gas consumption for water last 24 hours",
+        icon="mdi:cash",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_features={DeviceFeatures.HAS_METERING, DeviceFeatures.HAS_BOILER},
+        coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
+    ),
+    AristonSensorEntityDescription(
+        key="2|2|7",
+        name=f"{NAME} gas consumption for water last 7 days",
+        icon="mdi:cash",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_features={DeviceFeatures.HAS_METERING, DeviceFeatures.HAS_BOILER},
+        coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
+    ),
+    AristonSensorEntityDescription(
+        key="2|4|12",
+        name=f"{NAME} gas consumption for water last 12 months",
+        icon="mdi:cash",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_features={DeviceFeatures.HAS_METERING, DeviceFeatures.HAS_BOILER},
+        coordinator=ENERGY_COORDINATOR,
+        energy_source=EnergySource.CONSUMPTIONS_SEQUENCES,
+    ),
+)
@@ -1,23 +1,105 @@
 """Coordinator class for Ariston module."""
 from __future__ import annotations
-from datetime import timedelta
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
 
+import asyncio
 import logging
+import time
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
 
 from .const import (
     COORDINATOR,
+    DEFAULT_MAX_SCAN_INTERVAL_SECONDS,
+    DEFAULT_MIN_SCAN_INTERVAL_SECONDS,
     DOMAIN,
+    ENERGY_BOUNDARY_GRACE_MINUTES,
+    ENERGY_BOUNDARY_HOURS,
+    ENERGY_CONFIRM_RETRIES,
+    ENERGY_CONFIRM_RETRY_MINUTES,
     ENERGY_COORDINATOR,
+    FAST_ITEMS,
+    MAX_SCAN_INTERVAL_SLOWDOWN,
+    STATIC_ITEMS,
+    STATIC_SCAN_INTERVAL_MINUTES,
+    WRITE_CONFIRM_DELAYS_SECONDS,
+    ItemTier,
 )
 from .device import AristonDevice
-from .ariston import DeviceAttribute
+from .energy_statistics import ConsumptionStatisticsImporter
+from .ariston import (
+    ARISTON_WRITE_CONFIRM_TIMEOUT,
+    CircuitBreakerOpenError,
+    CircuitBreakerState,
+    DeviceAttribute,
+    DeviceFeatures,
+    DeviceProperties,
+    PlantMode,
+    PropertyType,
+    ThermostatProperties,
+    ZoneAttribute,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_run_with_deadline(
+    update: Callable[..., Awaitable], deadline_seconds: float, *args: Any
+) -> Any:
+    """Run an update, cancel it when the deadline is over and tell where it was"""
+    # API calls in flight of this update only, others may run at the same time
+    active_stages: list[str] = []
+    task = asyncio.ensure_future(update(*args, stages=active_stages))
+    try:
+        done, _ = await asyncio.wait({task}, timeout=deadline_seconds)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    if task in done:
+        return task.result()
+
+    stages = ", ".join(active_stages) or "unknown"
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+    raise UpdateFailed(
+        f"Update did not finish in {deadline_seconds} s, timed out during: {stages}"
+    )
+
+
+def get_item_tier(item_id: str) -> str:
+    """Get the polling tier of an item"""
+    if item_id in FAST_ITEMS:
+        return ItemTier.FAST
+    if item_id in STATIC_ITEMS:
+        return ItemTier.STATIC
+    return ItemTier.NORMAL
+
+
+def get_last_energy_bucket_start(now: datetime) -> datetime:
+    """Get the start of the last complete consumption sequence bucket"""
+    return get_next_energy_boundary(now) - timedelta(hours=2 * ENERGY_BOUNDARY_HOURS)
+
+
+def get_next_energy_boundary(now: datetime) -> datetime:
+    """Get the start of the next consumption sequence bucket"""
+    bucket_start = now.replace(
+        hour=now.hour - now.hour % ENERGY_BOUNDARY_HOURS,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+    return bucket_start + timedelta(hours=ENERGY_BOUNDARY_HOURS)
+
+
 class DeviceDataUpdateCoordinator(DataUpdateCoordinator):
     """Manages polling for state changes from the device."""
 
@@ -26,19 +108,219 @@ class DeviceDataUpdateCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         device: AristonDevice,
         scan_interval_seconds: int,
+        update_deadline_seconds: int,
+        fast_scan_interval_seconds: int,
+        adaptive_scan_interval: bool = False,
+        min_scan_interval_seconds: int = DEFAULT_MIN_SCAN_INTERVAL_SECONDS,
+        max_scan_interval_seconds: int = DEFAULT_MAX_SCAN_INTERVAL_SECONDS,
     ) -> None:
         """Initialize the data update coordinator."""
+        self.fast_scan_interval = timedelta(seconds=fast_scan_interval_seconds)
+        self.normal_scan_interval = timedelta(seconds=scan_interval_seconds)
+        self.tier_intervals = {
+            ItemTier.FAST: self.fast_scan_interval,
+            ItemTier.NORMAL: self.normal_scan_interval,
+            ItemTier.STATIC: timedelta(minutes=STATIC_SCAN_INTERVAL_MINUTES),
+        }
+        # One scheduler for every tier, it ticks at the shortest interval
+        self.scan_interval = min(self.tier_intervals.values())
+
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}-{device.attributes[DeviceAttribute.PLANT_NAME]}-{COORDINATOR}",
-            update_interval=timedelta(seconds=scan_interval_seconds),
+            update_interval=self.scan_interval,
         )
 
         self.device = device
+        self.update_deadline_seconds = update_deadline_seconds
+        self.tier_fetched: dict[str, float] = {}
+
+        # Fast tier bounds while the interval follows the plant activity
+        self.adaptive_scan_interval = adaptive_scan_interval
+        self.min_scan_interval = timedelta(seconds=min_scan_interval_seconds)
+        self.max_scan_interval = max(
+            timedelta(seconds=max_scan_interval_seconds), self.min_scan_interval
+        )
+        if adaptive_scan_interval:
+            self._set_fast_interval(self._clamp_scan_interval(self.fast_scan_interval))
+
+        # Multiplier of the scan interval while the circuit breaker is open
+        self.slowdown = 1
+
+        # Items changed by the last update, None if every entity should update
+        self.changed_items: set[tuple[str, int]] = None
+
+        # Written items re-read until the cloud reports them
+        self.confirm_items: set[tuple[str, int]] = set()
+        self.__confirm_task: asyncio.Task = None
+        self.__remove_write_listener = device.add_write_listener(
+            self._handle_device_write
+        )
+
+    @callback
+    def _handle_device_write(self, item_keys: set[tuple[str, int]]) -> None:
+        """Start confirming the written items"""
+        self.confirm_items |= item_keys
+        if self.adaptive_scan_interval:
+            # Taken on the next refresh, a confirmation reschedules it
+            self._set_fast_interval(self.min_scan_interval)
+            self.update_interval = self.scan_interval * self.slowdown
+        if self.__confirm_task is None or self.__confirm_task.done():
+            self.__confirm_task = self.hass.async_create_task(
+                self._async_confirm_writes()
+            )
+
+    @callback
+    def stop_write_confirmation(self) -> None:
+        """Stop listening for writes and cancel a running confirmation"""
+        self.__remove_write_listener()
+        if self.__confirm_task is not None:
+            self.__confirm_task.cancel()
+
+    async def _async_confirm_writes(self) -> None:
+        """Re-read only the written items at increasing delays until confirmed"""
+        for delay in WRITE_CONFIRM_DELAYS_SECONDS:
+            await asyncio.sleep(delay)
+
+            self.confirm_items &= set(self.device.pending_writes)
+            if not self.confirm_items:
+                return
+
+            try:
+                changed_items = await async_run_with_deadline(
+                    self.device.async_update_state,
+                    self.update_deadline_seconds,
+                    self.confirm_items,
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                _LOGGER.debug("Write confirmation read failed: %s", error)
+                continue
+
+            if changed_items:
+                self.changed_items = changed_items
+                self.async_set_updated_data(self.data)
+
+        # Not confirmed yet, left to the scheduled polls
+        self.confirm_items.clear()
+        self.device.expire_pending_writes()
 
     async def _async_update_data(self):
-        await self.device.async_update_state()
+        # Written items may not be polled at all, do not keep them pending forever
+        self.device.expire_pending_writes()
+        try:
+            fetched_tiers = await self._async_update_due_tiers()
+            if self.adaptive_scan_interval and ItemTier.FAST in fetched_tiers:
+                self._adapt_scan_interval()
+        except CircuitBreakerOpenError as error:
+            raise UpdateFailed(error) from error
+        finally:
+            self._adjust_update_interval()
+
+    def _get_due_tiers(self, now: float) -> set[str]:
+        """Get the tiers whose interval is over, with slack for timer jitter"""
+        slack = self.scan_interval.total_seconds() / 2
+        return {
+            tier
+            for tier, interval in self.tier_intervals.items()
+            if tier not in self.tier_fetched
+            or now - self.tier_fetched[tier] >= interval.total_seconds() - slack
+        }
+
+    async def _async_update_due_tiers(self) -> set[str]:
+        """Fetch the items of the due tiers in one request, return the tiers"""
+        now = time.monotonic()
+        due_tiers = self._get_due_tiers(now)
+
+        if len(due_tiers) == len(self.tier_intervals):
+            item_keys = None
+        else:
+            # Items subscribed since the last poll are read whatever their tier
+            unpolled_items = self.device.unpolled_items
+            item_keys = [
+                item_key
+                for item_key in self.device.requested_items
+                if get_item_tier(item_key[0]) in due_tiers or item_key in unpolled_items
+            ]
+            if not item_keys:
+                self.changed_items = set()
+                return set()
+
+        self.changed_items = await async_run_with_deadline(
+            self.device.async_update_state, self.update_deadline_seconds, item_keys
+        )
+        for tier in due_tiers:
+            self.tier_fetched[tier] = now
+        return due_tiers
+
+    def _clamp_scan_interval(self, interval: timedelta) -> timedelta:
+        """Keep an interval between the adaptive bounds"""
+        return min(max(interval, self.min_scan_interval), self.max_scan_interval)
+
+    def _set_fast_interval(self, interval: timedelta) -> None:
+        """Set the fast tier interval, the normal tier is never polled faster"""
+        self.tier_intervals[ItemTier.FAST] = interval
+        self.tier_intervals[ItemTier.NORMAL] = max(self.normal_scan_interval, interval)
+        self.scan_interval = min(self.tier_intervals.values())
+
+    def subscribe_activity_items(self) -> Callable:
+        """Poll the items the adaptive interval follows, return the unsubscribe"""
+        item_keys = [
+            (DeviceProperties.IS_FLAME_ON, 0),
+            (DeviceProperties.PLANT_MODE, 0),
+            (DeviceProperties.HOLIDAY, 0),
+        ]
+        for zone in self.device.features[DeviceFeatures.ZONES]:
+            item_keys.append(
+                (ThermostatProperties.ZONE_HEAT_REQUEST, zone[ZoneAttribute.NUM])
+            )
+        return self.device.subscribe_items(item_keys)
+
+    def _is_plant_active(self) -> bool:
+        """Flame on, a zone requesting heat or a recent write not confirmed yet"""
+        now = time.monotonic()
+        if any(
+            now - pending_write.written <= ARISTON_WRITE_CONFIRM_TIMEOUT
+            for pending_write in self.device.pending_writes.values()
+        ):
+            return True
+        if self.device.get_item_by_id(DeviceProperties.IS_FLAME_ON, PropertyType.VALUE):
+            return True
+        return any(
+            item.value
+            for (item_id, _), item in self.device.items.items()
+            if item_id == ThermostatProperties.ZONE_HEAT_REQUEST
+        )
+
+    def _is_plant_idle(self) -> bool:
+        """Plant switched off or on holiday"""
+        return bool(
+            self.device.get_item_by_id(DeviceProperties.PLANT_MODE, PropertyType.VALUE)
+            == PlantMode.OFF
+            or self.device.get_item_by_id(DeviceProperties.HOLIDAY, PropertyType.VALUE)
+        )
+
+    def _adapt_scan_interval(self) -> None:
+        """Poll fast while the plant is active, back off while idle or stable"""
+        fast_interval = self.tier_intervals[ItemTier.FAST]
+        if self._is_plant_active():
+            fast_interval = self.min_scan_interval
+        elif self._is_plant_idle() or not self.changed_items:
+            fast_interval = min(fast_interval * 2, self.max_scan_interval)
+        else:
+            fast_interval = self._clamp_scan_interval(self.fast_scan_interval)
+
+        if fast_interval != self.tier_intervals[ItemTier.FAST]:
+            _LOGGER.debug("%s fast scan interval is %s", self.name, fast_interval)
+            self._set_fast_interval(fast_interval)
+
+    def _adjust_update_interval(self) -> None:
+        """Poll slower while the circuit breaker is open, then recover gradually"""
+        if self.device.api.circuit_breaker.state == CircuitBreakerState.CLOSED:
+            self.slowdown = max(self.slowdown // 2, 1)
+        else:
+            self.slowdown = min(self.slowdown * 2, MAX_SCAN_INTERVAL_SLOWDOWN)
+        self.update_interval = self.scan_interval * self.slowdown
 
 
 class DeviceEnergyUpdateCoordinator(DataUpdateCoordinator):
@@ -49,16 +331,75 @@ class DeviceEnergyUpdateCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         device: AristonDevice,
         energy_interval_minutes: int,
+        update_deadline_seconds: int,
+        statistics_importer: ConsumptionStatisticsImporter = None,
     ) -> None:
         """Initialize the data update coordinator."""
+        # Used after a failed update, otherwise the bucket boundaries are followed
+        self.energy_interval = timedelta(minutes=energy_interval_minutes)
+
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}-{device.attributes[DeviceAttribute.PLANT_NAME]}-{ENERGY_COORDINATOR}",
-            update_interval=timedelta(minutes=energy_interval_minutes),
+            update_interval=self.energy_interval,
         )
 
         self.device = device
+        self.update_deadline_seconds = update_deadline_seconds
+
+        # Boundary the next bucket is expected at, and retries waiting for it
+        self.next_boundary: datetime = None
+        self.confirm_retries = 0
+
+        self.statistics_importer = statistics_importer
+
+        # Energy data is not diffed, every entity updates
+        self.changed_items: set[tuple[str, int]] = None
 
     async def _async_update_data(self):
-        await self.device.async_update_energy()
+        previous_versions = dict(self.device.consumptions_sequence_versions)
+        updated = False
+        try:
+            await async_run_with_deadline(
+                self.device.async_update_energy, self.update_deadline_seconds
+            )
+            updated = True
+        except CircuitBreakerOpenError as error:
+            raise UpdateFailed(error) from error
+        finally:
+            self._adjust_update_interval(
+                updated,
+                self.device.consumptions_sequence_versions != previous_versions,
+            )
+
+        if self.statistics_importer is not None:
+            try:
+                await self.statistics_importer.async_import()
+            except Exception as error:  # pylint: disable=broad-except
+                # The energy data is fine, only the history import failed
+                _LOGGER.warning("Failed to import consumption statistics: %s", error)
+
+    def _adjust_update_interval(self, updated: bool, new_bucket: bool) -> None:
+        """Poll just after the next bucket boundary, retry shortly if it is late"""
+        if not updated:
+            self.update_interval = self.energy_interval
+            return
+
+        now = dt_util.now()
+        if (
+            not new_bucket
+            and self.next_boundary is not None
+            and now >= self.next_boundary
+            and self.confirm_retries < ENERGY_CONFIRM_RETRIES
+        ):
+            # Boundary passed, but the cloud did not publish the new bucket yet
+            self.confirm_retries += 1
+            self.update_interval = timedelta(minutes=ENERGY_CONFIRM_RETRY_MINUTES)
+            return
+
+        self.confirm_retries = 0
+        self.next_boundary = get_next_energy_boundary(now)
+        self.update_interval = (
+            self.next_boundary - now + timedelta(minutes=ENERGY_BOUNDARY_GRACE_MINUTES)
+        )
@@ -1,32 +1,177 @@
 """Device class for Ariston module."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 
-from typing import Any
+from array import array
+from collections import Counter
+from typing import Any, Awaitable, Callable, Iterable
 from datetime import date
 
 from .ariston import (
+    ARISTON_WRITE_CONFIRM_TIMEOUT,
     AristonAPI,
     ConsumptionProperties,
     DeviceAttribute,
     DeviceFeatures,
     DeviceProperties,
+    EnergySource,
     PropertyType,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Option lists and units repeat for every item and every poll, keep one copy
+_interned: dict[Any, Any] = {}
+
+
+def _intern(value: Any) -> Any:
+    """Get the shared copy of a metadata value, lists become tuples"""
+    if isinstance(value, list):
+        value = tuple(value)
+    try:
+        return _interned.setdefault(value, value)
+    except TypeError:
+        return value
+
+
+class ConsumptionSequence:
+    """Values of a consumption sequence in a typed array, the oldest first"""
+
+    __slots__ = ("values", "values_hash")
+
+    def __init__(self, values: Iterable[float], values_hash: int) -> None:
+        # Missing buckets count as no consumption
+        self.values = array("d", (value or 0.0 for value in values))
+        self.values_hash = values_hash
+
+    @property
+    def last(self) -> float or None:
+        """Consumption of the latest complete bucket"""
+        return self.values[-1] if self.values else None
+
+    def rolling_sum(self, count: int) -> float:
+        """Consumption of the latest buckets"""
+        return sum(self.values[-count:])
+
+
+class AristonItem:
+    """Compact state of a device or thermostat item"""
+
+    __slots__ = (
+        "id",
+        "zone",
+        "value",
+        "options",
+        "opt_texts",
+        "unit",
+        "min",
+        "max",
+        "step",
+        "decimals",
+        "expires_on",
+    )
+
+    # Item properties from the cloud and their attributes
+    ATTRIBUTES: dict[PropertyType, str] = {
+        PropertyType.VALUE: "value",
+        PropertyType.OPTIONS: "options",
+        PropertyType.OPT_TEXTS: "opt_texts",
+        PropertyType.UNIT: "unit",
+        PropertyType.MIN: "min",
+        PropertyType.MAX: "max",
+        PropertyType.STEP: "step",
+        PropertyType.DECIMALS: "decimals",
+        PropertyType.ZONE: "zone",
+        PropertyType.EXPIRES_ON: "expires_on",
+    }
+
+    def __init__(self, item: dict[str, Any]) -> None:
+        self.id = item["id"]
+        self.zone = item[PropertyType.ZONE]
+        self.update(item)
+
+    def update(self, item: dict[str, Any]) -> bool:
+        """Update from the decoded cloud item, return whether anything changed"""
+        previous = self.state if hasattr(self, "value") else None
+        self.value = item.get(PropertyType.VALUE)
+        self.options = _intern(item.get(PropertyType.OPTIONS))
+        self.opt_texts = _intern(item.get(PropertyType.OPT_TEXTS))
+        self.unit = _intern(item.get(PropertyType.UNIT))
+        self.min = item.get(PropertyType.MIN)
+        self.max = item.get(PropertyType.MAX)
+        self.step = item.get(PropertyType.STEP)
+        self.decimals = item.get(PropertyType.DECIMALS)
+        self.expires_on = item.get(PropertyType.EXPIRES_ON)
+        return previous != self.state
+
+    @property
+    def state(self) -> tuple:
+        """All properties of the item"""
+        return (
+            self.value,
+            self.options,
+            self.opt_texts,
+            self.unit,
+            self.min,
+            self.max,
+            self.step,
+            self.decimals,
+            self.expires_on,
+        )
+
+    def get(self, item_value: PropertyType) -> Any:
+        """Get an item property by its cloud name"""
+        return getattr(self, self.ATTRIBUTES[item_value])
+
+
+class PendingWrite:
+    """Value written to an item and not yet reported back by the cloud"""
+
+    __slots__ = ("value", "properties", "fence", "written")
+
+    def __init__(
+        self, value: Any, fence: int, properties: dict[str, Any] = None
+    ) -> None:
+        self.value = value
+        # Other properties set by the write, kept with the value
+        self.properties = properties or {}
+        self.fence = fence
+        self.written = time.monotonic()
+
+
+class DebouncedWrite:
+    """Last value set for an item during the write window"""
+
+    __slots__ = ("previous", "value", "deadline", "task", "pending_write")
+
+    def __init__(self, previous: Any) -> None:
+        self.previous = previous
+        self.value: Any = None
+        self.deadline: float = 0
+        self.task: asyncio.Task = None
+        self.pending_write: PendingWrite = None
+
 
 class AristonDevice:
     """Class representing a physical device, it's state and properties."""
 
+    # Energy sources and the attributes holding their last data
+    ENERGY_ATTRIBUTES: dict[str, str] = {
+        EnergySource.CONSUMPTIONS_SEQUENCES: "consumptions_sequences",
+        EnergySource.CONSUMPTIONS_SETTINGS: "consumptions_settings",
+        EnergySource.ENERGY_ACCOUNT: "energy_account",
+    }
+
     def __init__(
         self,
         attributes: dict[str, Any],
         api: AristonAPI,
         extra_energy_features: bool,
         is_metric: bool = True,
+        write_debounce_seconds: float = 0,
     ) -> None:
         self.api = api
         self.attributes = attributes
@@ -39,8 +184,74 @@ class AristonDevice:
         self.consumptions_settings = None
 
         self.energy_account = None
-        self.consumptions_sequences = None
-        self.data = None
+        self.consumptions_sequences: dict[tuple[int, int], ConsumptionSequence] = None
+        # Bumped only when the values of a (k, p) sequence change
+        self.consumptions_sequence_versions: dict[tuple[int, int], int] = {}
+        # Sources that failed on the last energy update, their data is old
+        self.stale_energy_sources: set[str] = set()
+        self.items: dict[tuple[str, int], AristonItem] = {}
+
+        # Items needed by the entities added to hass
+        self.__item_subscriptions: Counter[tuple[str, int]] = Counter()
+        self.__requested_items: tuple[tuple[str, int], ...] = None
+        self.__polled_items: set[tuple[str, int]] = set()
+
+        # Writes waiting for the end of their window, by (id, zone)
+        self.write_debounce_seconds = write_debounce_seconds
+        self.__debounced_writes: dict[tuple[str, int], DebouncedWrite] = {}
+
+        # Written values kept over polls until the cloud confirms them
+        self.pending_writes: dict[tuple[str, int], PendingWrite] = {}
+        self.__write_fence = 0
+        self.__write_listeners: list[Callable[[set[tuple[str, int]]], None]] = []
+
+        self.write_confirm_count = 0
+        self.write_confirm_last_latency: float = None
+        self.write_confirm_total_latency = 0.0
+        self.write_expired_count = 0
+
+    @property
+    def write_statistics(self) -> dict[str, Any]:
+        """Time taken by the cloud to report written values"""
+        return {
+            "pending": len(self.pending_writes),
+            "confirm_count": self.write_confirm_count,
+            "confirm_last_latency": self.write_confirm_last_latency,
+            "confirm_average_latency": self.write_confirm_total_latency
+            / self.write_confirm_count
+            if self.write_confirm_count
+            else None,
+            "expired_count": self.write_expired_count,
+        }
+
+    def add_write_listener(
+        self, listener: Callable[[set[tuple[str, int]]], None]
+    ) -> Callable:
+        """Call the listener with the items sent to the cloud, return the remove"""
+        self.__write_listeners.append(listener)
+
+        def remove_listener() -> None:
+            self.__write_listeners.remove(listener)
+
+        return remove_listener
+
+    def __notify_write(self, item_keys: set[tuple[str, int]]) -> None:
+        """Tell the listeners which items were written"""
+        for listener in list(self.__write_listeners):
+            listener(item_keys)
+
+    @staticmethod
+    async def __async_stage(
+        stage: str, awaitable: Awaitable, stages: list[str] = None
+    ) -> Any:
+        """Await an API call while it is listed in the stages of its update"""
+        if stages is None:
+            return await awaitable
+        stages.append(stage)
+        try:
+            return await awaitable
+        finally:
+            stages.remove(stage)
 
     async def async_get_features(self) -> None:
         """Get device features wrapper"""
@@ -48,38 +259,229 @@ class AristonDevice:
             self.attributes[DeviceAttribute.GW_ID]
         )
 
-    async def async_update_state(self) -> None:
-        """Update the device states from the cloud"""
-        self.data = await self.api.async_get_properties(
-            self.attributes[DeviceAttribute.GW_ID],
-            self.features,
-            self.location,
-            self.umsys,
+    def subscribe_items(self, item_keys: Iterable[tuple[str, int]]) -> Callable:
+        """Poll the items while the subscription is alive, return the unsubscribe"""
+        item_keys = list(item_keys)
+        self.__item_subscriptions.update(item_keys)
+        self.__requested_items = None
+
+        def unsubscribe() -> None:
+            self.__item_subscriptions.subtract(item_keys)
+            self.__item_subscriptions += Counter()
+            self.__requested_items = None
+
+        return unsubscribe
+
+    @property
+    def requested_items(self) -> tuple[tuple[str, int], ...]:
+        """Items to poll, all of them until entities subscribe"""
+        if self.__requested_items is None:
+            if self.__item_subscriptions:
+                item_keys = set(self.__item_subscriptions)
+                # Not polled anymore, must not be read with their last value
+                for key in set(self.items) - item_keys:
+                    del self.items[key]
+                self.__polled_items &= item_keys
+            else:
+                item_keys = self.api.get_item_keys(self.features)
+            self.__requested_items = tuple(sorted(item_keys))
+        return self.__requested_items
+
+    @property
+    def unpolled_items(self) -> set[tuple[str, int]]:
+        """Requested items not polled since they were subscribed"""
+        return set(self.requested_items) - self.__polled_items
+
+    async def async_update_state(
+        self, item_keys: Iterable[tuple[str, int]] = None, stages: list[str] = None
+    ) -> set[tuple[str, int]]:
+        """Update the device states from the cloud, return the changed items"""
+        requested_items = (
+            self.requested_items if item_keys is None else tuple(sorted(item_keys))
+        )
+        # Writes made after this point are newer than the polled data
+        poll_fence = self.__write_fence
+        data = await self.__async_stage(
+            "properties",
+            self.api.async_get_properties(
+                self.attributes[DeviceAttribute.GW_ID],
+                self.features,
+                self.location,
+                self.umsys,
+                requested_items,
+            ),
+            stages,
+        )
+        self.__polled_items.update(requested_items)
+
+        # Records are kept between polls and updated in place
+        received_items = set()
+        changed_items = set()
+        for item_data in data["items"]:
+            key = (item_data["id"], item_data[PropertyType.ZONE])
+            received_items.add(key)
+            if key in self.pending_writes:
+                item_data = self.__merge_pending_write(key, item_data, poll_fence)
+            item = self.items.get(key)
+            if item is None:
+                self.items[key] = AristonItem(item_data)
+                changed_items.add(key)
+            elif item.update(item_data):
+                changed_items.add(key)
+
+        # Requested, but not returned by the cloud anymore
+        for key in set(requested_items) - received_items:
+            if self.items.pop(key, None) is not None:
+                changed_items.add(key)
+
+        return changed_items
+
+    def __add_pending_write(
+        self, key: tuple[str, int], value: Any, properties: dict[str, Any] = None
+    ) -> PendingWrite:
+        """Fence a written value against the polls already in flight"""
+        self.__write_fence += 1
+        pending_write = self.pending_writes[key] = PendingWrite(
+            value, self.__write_fence, properties
         )
+        return pending_write
+
+    def __remove_pending_write(
+        self, key: tuple[str, int], pending_write: PendingWrite
+    ) -> None:
+        """Forget a write that did not reach the cloud, unless a newer one did"""
+        if self.pending_writes.get(key) is pending_write:
+            del self.pending_writes[key]
+
+    def expire_pending_writes(self) -> None:
+        """Forget the writes the cloud did not confirm in time, polled or not"""
+        now = time.monotonic()
+        for key, pending_write in list(self.pending_writes.items()):
+            if now - pending_write.written > ARISTON_WRITE_CONFIRM_TIMEOUT:
+                _LOGGER.debug(
+                    "Write of %s to %s was not confirmed in time",
+                    pending_write.value,
+                    key,
+                )
+                del self.pending_writes[key]
+                self.write_expired_count += 1
+
+    def __merge_pending_write(
+        self, key: tuple[str, int], item_data: dict[str, Any], poll_fence: int
+    ) -> dict[str, Any]:
+        """Keep the written value in polled data until the cloud confirms it"""
+        pending_write = self.pending_writes[key]
+        if item_data.get(PropertyType.VALUE) == pending_write.value:
+            del self.pending_writes[key]
+            latency = time.monotonic() - pending_write.written
+            self.write_confirm_count += 1
+            self.write_confirm_last_latency = latency
+            self.write_confirm_total_latency += latency
+            return item_data
+
+        if (
+            pending_write.fence <= poll_fence
+            and time.monotonic() - pending_write.written > ARISTON_WRITE_CONFIRM_TIMEOUT
+        ):
+            _LOGGER.debug(
+                "Write of %s to %s was not confirmed, using the cloud value",
+                pending_write.value,
+                key,
+            )
+            del self.pending_writes[key]
+            self.write_expired_count += 1
+            return item_data
 
-    async def async_update_energy(self) -> None:
+        return {
+            **item_data,
+            **pending_write.properties,
+            PropertyType.VALUE: pending_write.value,
+        }
+
+    async def async_update_energy(self, stages: list[str] = None) -> None:
         """Update the device energy settings from the cloud"""
 
         # k=1: heating k=2: water
         # p=1: 12*2 hours p=2: 7*1 day p=3: 15*2 days p=4: 12*? year
-        # v: first element is the latest, last element is the newest"""
-        self.consumptions_sequences = await self.api.async_get_consumptions_sequences(
-            self.attributes[DeviceAttribute.GW_ID],
-            self.features[DeviceFeatures.HAS_BOILER],
-            self.features[DeviceFeatures.HAS_SLP],
-        )
+        # v: oldest bucket first, the last one is the latest complete bucket,
+        # the running bucket is not reported
+        gw_id = self.attributes[DeviceAttribute.GW_ID]
+        requests = [
+            (
+                EnergySource.CONSUMPTIONS_SEQUENCES,
+                self.api.async_get_consumptions_sequences(
+                    gw_id,
+                    self.features[DeviceFeatures.HAS_BOILER],
+                    self.features[DeviceFeatures.HAS_SLP],
+                ),
+            )
+        ]
 
         if self.extra_energy_features:
             # These settings only for official clients
-            self.consumptions_settings = await self.api.async_get_consumptions_settings(
-                self.attributes[DeviceAttribute.GW_ID]
+            requests.append(
+                (
+                    EnergySource.CONSUMPTIONS_SETTINGS,
+                    self.api.async_get_consumptions_settings(gw_id),
+                )
             )
 
             # Last month consumption in kwh
-            self.energy_account = await self.api.async_get_energy_account(
-                self.attributes[DeviceAttribute.GW_ID]
+            requests.append(
+                (
+                    EnergySource.ENERGY_ACCOUNT,
+                    self.api.async_get_energy_account(gw_id),
+                )
             )
 
+        # The endpoints are independent, a failed one keeps its old data
+        results = await asyncio.gather(
+            *(
+                self.__async_stage(source, request, stages)
+                for source, request in requests
+            ),
+            return_exceptions=True,
+        )
+
+        errors = {}
+        for (source, _), result in zip(requests, results):
+            if isinstance(result, BaseException):
+                errors[source] = result
+            elif source == EnergySource.CONSUMPTIONS_SEQUENCES:
+                self.__update_consumptions_sequences(result)
+            else:
+                setattr(self, self.ENERGY_ATTRIBUTES[source], result)
+        self.stale_energy_sources = set(errors)
+
+        if len(errors) == len(requests):
+            raise next(iter(errors.values()))
+        for source, error in errors.items():
+            _LOGGER.warning("Failed to update %s, keeping old data: %s", source, error)
+
+    def __update_consumptions_sequences(self, sequences: list[dict[str, Any]]) -> None:
+        """Store the fetched sequences, only the changed ones are rebuilt"""
+        previous_sequences = self.consumptions_sequences or {}
+        consumptions_sequences = {}
+        for sequence_data in sequences:
+            key = (sequence_data["k"], sequence_data["p"])
+            values_hash = hash(tuple(sequence_data["v"]))
+            sequence = previous_sequences.get(key)
+            if sequence is None or sequence.values_hash != values_hash:
+                sequence = ConsumptionSequence(sequence_data["v"], values_hash)
+                self.consumptions_sequence_versions[key] = (
+                    self.consumptions_sequence_versions.get(key, 0) + 1
+                )
+            consumptions_sequences[key] = sequence
+        self.consumptions_sequences = consumptions_sequences
+
+    def get_consumptions_sequence(self, k: int, p: int) -> ConsumptionSequence or None:
+        """Get the sequence of a consumption kind and period"""
+        return (self.consumptions_sequences or {}).get((k, p))
+
+    def is_energy_source_available(self, source: str) -> bool:
+        """Whether the source has data, even stale one"""
+        return getattr(self, self.ENERGY_ATTRIBUTES[source]) is not None
+
     async def async_set_consumptions_settings(
         self, consumption_property: ConsumptionProperties, value: int
     ):
@@ -95,30 +497,120 @@ class AristonDevice:
         self, item_id: DeviceProperties, item_value: PropertyType, zone_number: int = 0
     ):
         """Get item attribute from data"""
-        return next(
-            item.get(item_value, None)
-            for item in self.data["items"]
-            if item["id"] == item_id and item[PropertyType.ZONE] == zone_number
-        )
+        item = self.items.get((item_id, zone_number))
+        if item is None:
+            return None
+        return item.get(item_value)
 
     async def async_set_item_by_id(
         self, item_id: str, value: float, zone_number: int = 0
     ):
         """Set item attribute on device"""
-        current_value = self.get_item_by_id(item_id, PropertyType.VALUE, zone_number)
-        await self.api.async_set_property(
-            self.attributes[DeviceAttribute.GW_ID],
-            zone_number,
-            self.features,
-            item_id,
-            value,
-            current_value,
-            self.umsys,
-        )
-        for item in self.data["items"]:
-            if item["id"] == item_id and item[PropertyType.ZONE] == zone_number:
-                item[PropertyType.VALUE] = value
-                break
+        await self.async_set_items_by_id([(item_id, value, zone_number)])
+
+    async def async_set_items_by_id(self, changes: list[tuple[str, float, int]]):
+        """Set several (item id, value, zone) on device in one request"""
+        requested_items = set(self.requested_items)
+        missing_items = {
+            (item_id, zone_number)
+            for item_id, _, zone_number in changes
+            if (item_id, zone_number) not in self.items
+            or (item_id, zone_number) not in requested_items
+        }
+        if missing_items:
+            # Not polled for any entity, read them for the previous values
+            await self.async_update_state(missing_items)
+
+        properties = [
+            (
+                item_id,
+                zone_number,
+                value,
+                self.get_item_by_id(item_id, PropertyType.VALUE, zone_number),
+            )
+            for item_id, value, zone_number in changes
+        ]
+        pending_writes = {
+            (item_id, zone_number): self.__add_pending_write(
+                (item_id, zone_number), value
+            )
+            for item_id, value, zone_number in changes
+        }
+        try:
+            await self.api.async_set_properties(
+                self.attributes[DeviceAttribute.GW_ID],
+                self.features,
+                properties,
+                self.umsys,
+            )
+        except Exception:
+            for key, pending_write in pending_writes.items():
+                self.__remove_pending_write(key, pending_write)
+            raise
+        self.__notify_write(set(pending_writes))
+
+        for item_id, value, zone_number in changes:
+            item = self.items.get((item_id, zone_number))
+            if item is not None:
+                item.value = value
+
+    def set_item_by_id_debounced(
+        self, item_id: str, value: float, zone_number: int = 0
+    ) -> Awaitable:
+        """Set item attribute locally now and on device after the write window"""
+        key = (item_id, zone_number)
+        loop = asyncio.get_running_loop()
+
+        # Only the last value set during the window is sent
+        write = self.__debounced_writes.get(key)
+        if write is None:
+            write = self.__debounced_writes[key] = DebouncedWrite(
+                self.get_item_by_id(item_id, PropertyType.VALUE, zone_number)
+            )
+            write.task = loop.create_task(self.__async_flush_write(key, write))
+        write.value = value
+        write.deadline = loop.time() + self.write_debounce_seconds
+        write.pending_write = self.__add_pending_write(key, value)
+
+        item = self.items.get(key)
+        if item is not None:
+            item.value = value
+
+        # Every caller waits for the write, cancelling one does not cancel it
+        return asyncio.shield(write.task)
+
+    async def __async_flush_write(
+        self, key: tuple[str, int], write: DebouncedWrite
+    ) -> None:
+        """Send the debounced write once its window is over"""
+        loop = asyncio.get_running_loop()
+        while (delay := write.deadline - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        del self.__debounced_writes[key]
+
+        item_id, zone_number = key
+        try:
+            if key not in self.items or key not in self.requested_items:
+                # Not polled for any entity, read it for the previous value
+                await self.async_set_items_by_id([(item_id, write.value, zone_number)])
+            elif write.value != write.previous:
+                await self.api.async_set_properties(
+                    self.attributes[DeviceAttribute.GW_ID],
+                    self.features,
+                    [(item_id, zone_number, write.value, write.previous)],
+                    self.umsys,
+                )
+                self.__notify_write({key})
+            else:
+                # Back to the device value, nothing to send or confirm
+                self.__remove_pending_write(key, write.pending_write)
+        except Exception:
+            # Not written, show the device value again
+            self.__remove_pending_write(key, write.pending_write)
+            item = self.items.get(key)
+            if item is not None and item.value == write.value:
+                item.value = write.previous
+            raise
 
     async def async_set_holiday(self, holiday_end: date):
         """Set holiday on device"""
@@ -126,18 +618,25 @@ class AristonDevice:
             None if holiday_end is None else holiday_end.strftime("%Y-%m-%dT00:00:00")
         )
 
-        await self.api.async_set_holiday(
-            self.attributes[DeviceAttribute.GW_ID],
-            holiday_end_date,
+        key = (DeviceProperties.HOLIDAY, 0)
+        value = holiday_end_date is not None
+        pending_write = self.__add_pending_write(
+            key, value, {PropertyType.EXPIRES_ON: holiday_end_date}
         )
+        try:
+            await self.api.async_set_holiday(
+                self.attributes[DeviceAttribute.GW_ID],
+                holiday_end_date,
+            )
+        except Exception:
+            self.__remove_pending_write(key, pending_write)
+            raise
+        self.__notify_write({key})
 
-        for item in self.data["items"]:
-            if item["id"] == DeviceProperties.HOLIDAY:
-                item[PropertyType.VALUE] = False if holiday_end_date is None else True
-                item[PropertyType.EXPIRES_ON] = (
-                    None if holiday_end_date is None else holiday_end_date
-                )
-                break
+        item = self.items.get(key)
+        if item is not None:
+            item.value = value
+            item.expires_on = holiday_end_date
 
     def are_device_features_available(
         self, device_features, extra_energy_feature
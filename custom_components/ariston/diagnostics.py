@@ -0,0 +1,29 @@
+"""Diagnostics support for Ariston."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .ariston import AristonAPI
+from .const import API, COORDINATOR, DOMAIN
+from .coordinator import DeviceDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    api: AristonAPI = hass.data[DOMAIN][entry.unique_id][API]
+    coordinator: DeviceDataUpdateCoordinator = hass.data[DOMAIN][entry.unique_id][
+        COORDINATOR
+    ]
+
+    return {
+        "token": api.token_statistics,
+        "circuit_breaker": api.circuit_breaker.statistics,
+        "limiter": api.limiter.statistics,
+        "transfer": api.transfer_statistics,
+        "writes": coordinator.device.write_statistics,
+    }
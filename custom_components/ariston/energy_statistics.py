@@ -0,0 +1,238 @@
+"""Consumption history import into long-term statistics for Ariston."""
+from __future__ import annotations
+
+import logging
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import ENERGY_KILO_WATT_HOUR
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt_util
+
+from .ariston import DeviceAttribute
+from .const import (
+    DOMAIN,
+    ENERGY_BOUNDARY_HOURS,
+    NAME,
+    STATISTICS_ANCHOR_PERIODS,
+    STATISTICS_MAX_HOLD_HOURS,
+    STATISTICS_PERIODS,
+    STATISTICS_STORAGE_KEY,
+    STATISTICS_STORAGE_VERSION,
+)
+from .device import AristonDevice, ConsumptionSequence
+
+_LOGGER = logging.getLogger(__name__)
+
+CONSUMPTION_KIND_NAMES: dict[int, str] = {1: "heating", 2: "water"}
+CONSUMPTION_PERIOD_NAMES: dict[int, str] = {3: "two days", 4: "months"}
+
+
+def get_current_bucket_start(period: int, now: datetime) -> datetime:
+    """Get the start of the running bucket, the end of the last complete one"""
+    if period == 1:
+        return now.replace(
+            hour=now.hour - now.hour % ENERGY_BOUNDARY_HOURS,
+            minute=0,
+            second=0,
+            microsecond=0,
+        )
+    midnight = dt_util.start_of_local_day(now)
+    if period == 2:
+        return midnight
+    if period == 3:
+        # Two day buckets, aligned to even days so they do not move daily
+        return midnight - timedelta(days=midnight.toordinal() % 2)
+    # Monthly buckets
+    return midnight.replace(day=1)
+
+
+def shift_bucket_start(period: int, start: datetime, buckets: int) -> datetime:
+    """Move a bucket start by a number of buckets, backwards if negative"""
+    if period == 1:
+        return start + timedelta(hours=ENERGY_BOUNDARY_HOURS * buckets)
+    if period == 2:
+        return start + timedelta(days=buckets)
+    if period == 3:
+        return start + timedelta(days=2 * buckets)
+    month_index = start.year * 12 + start.month - 1 + buckets
+    return start.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def count_buckets(period: int, start: datetime, end: datetime) -> int:
+    """Count the buckets from one bucket start to a later one"""
+    if period == 1:
+        return int((end - start) / timedelta(hours=ENERGY_BOUNDARY_HOURS))
+    if period == 2:
+        return (end.date() - start.date()).days
+    if period == 3:
+        return (end.date() - start.date()).days // 2
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def has_sequence_shifted(
+    previous_values: list[float], values: list[float], buckets: int
+) -> bool:
+    """Whether the buckets moved towards the start by the bucket count"""
+    kept = len(previous_values) - buckets
+    if kept <= 0:
+        return True
+    return previous_values[buckets:] == list(values[:kept])
+
+
+class ConsumptionStatisticsImporter:
+    """Writes the buckets of the long consumption sequences to the recorder"""
+
+    def __init__(self, hass: HomeAssistant, device: AristonDevice) -> None:
+        self.hass = hass
+        self.device = device
+        self.gw_id = device.attributes[DeviceAttribute.GW_ID]
+
+        # Per statistic: start and value of the last imported bucket, running sum
+        self.store = Store(
+            hass, STATISTICS_STORAGE_VERSION, f"{STATISTICS_STORAGE_KEY}_{self.gw_id}"
+        )
+        self.high_water_marks: dict[str, dict[str, Any]] = None
+
+        # Short sequence as last seen, and the end of its last bucket once it
+        # was seen rolling over, which is how far the cloud published data
+        self.anchor_values: list[float] = None
+        self.published_until: datetime = None
+
+        # Sequence version and published end already looked at, by statistic
+        self.imported: dict[str, tuple[int, datetime]] = {}
+        # Statistics whose sequence does not match the last imported bucket
+        self.held_since: dict[str, datetime] = {}
+
+    async def async_import(self) -> None:
+        """Import the buckets completed since the high-water marks"""
+        sequences = self.device.consumptions_sequences or {}
+        now = dt_util.now()
+        self.__update_anchor(sequences, now)
+        if self.published_until is None:
+            return
+
+        if self.high_water_marks is None:
+            self.high_water_marks = await self.store.async_load() or {}
+
+        updated = False
+        for (k, p), sequence in sequences.items():
+            if p not in STATISTICS_PERIODS:
+                continue
+            statistic_id = f"{DOMAIN}:{slugify(self.gw_id)}_consumption_{k}_{p}"
+            imported = (
+                self.device.consumptions_sequence_versions.get((k, p)),
+                self.published_until,
+            )
+            if self.imported.get(statistic_id) == imported:
+                continue
+            self.imported[statistic_id] = imported
+            if self.__import_sequence(statistic_id, k, p, sequence, now):
+                updated = True
+
+        # Written only when a high-water mark moved
+        if updated:
+            await self.store.async_save(self.high_water_marks)
+
+    def __update_anchor(
+        self, sequences: dict[tuple[int, int], ConsumptionSequence], now: datetime
+    ) -> None:
+        """Learn how far the cloud published data from a short sequence rolling over"""
+        anchor_keys = sorted(
+            (STATISTICS_ANCHOR_PERIODS.index(p), k, p)
+            for k, p in sequences
+            if p in STATISTICS_ANCHOR_PERIODS
+        )
+        if not anchor_keys:
+            return
+        _, k, p = anchor_keys[0]
+        values = list(sequences[(k, p)].values)
+
+        if self.anchor_values is not None and values != self.anchor_values:
+            end = get_current_bucket_start(p, now)
+            if self.published_until is None:
+                # Polls follow the boundaries, a new bucket ended at the last one
+                self.published_until = end
+            else:
+                buckets = count_buckets(p, self.published_until, end)
+                if buckets > 0 and has_sequence_shifted(
+                    self.anchor_values, values, buckets
+                ):
+                    self.published_until = end
+                elif buckets > 0:
+                    # Late or revised buckets, anchor again on the next rollover
+                    _LOGGER.debug("Consumption sequence rollover not recognized")
+                    self.published_until = None
+        self.anchor_values = values
+
+    def __import_sequence(
+        self,
+        statistic_id: str,
+        k: int,
+        p: int,
+        sequence: ConsumptionSequence,
+        now: datetime,
+    ) -> bool:
+        """Add the new buckets of a sequence, return whether the mark moved"""
+        values = sequence.values
+        # The last value is the bucket that ended with the published data
+        end = get_current_bucket_start(p, self.published_until)
+        starts = [
+            shift_bucket_start(p, end, index - len(values))
+            for index in range(len(values))
+        ]
+
+        high_water_mark = self.high_water_marks.get(statistic_id)
+        last_start = None
+        moved = False
+        if high_water_mark is not None:
+            last_start = dt_util.parse_datetime(high_water_mark["start"])
+            if last_start in starts:
+                value = values[starts.index(last_start)]
+                if value != high_water_mark["value"]:
+                    held_since = self.held_since.setdefault(statistic_id, now)
+                    if now - held_since < timedelta(hours=STATISTICS_MAX_HOLD_HOURS):
+                        # Not rolled over with the short sequence yet
+                        _LOGGER.debug("%s did not roll over yet", statistic_id)
+                        return False
+                    # Revised by the cloud, the imported bucket stays as it was
+                    _LOGGER.debug("%s was revised, importing on", statistic_id)
+                    high_water_mark["value"] = value
+                    moved = True
+        self.held_since.pop(statistic_id, None)
+
+        total = 0.0 if high_water_mark is None else high_water_mark["sum"]
+        statistics: list[StatisticData] = []
+        for start, value in zip(starts, values):
+            if last_start is not None and start <= last_start:
+                continue
+            total += value
+            statistics.append(StatisticData(start=start, state=value, sum=total))
+        if not statistics:
+            return moved
+
+        plant_name = self.device.attributes[DeviceAttribute.PLANT_NAME]
+        kind = CONSUMPTION_KIND_NAMES.get(k, f"kind {k}")
+        period = CONSUMPTION_PERIOD_NAMES.get(p, f"period {p}")
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{NAME} {plant_name} {kind} consumption ({period})",
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        )
+        _LOGGER.debug("Importing %s buckets into %s", len(statistics), statistic_id)
+        async_add_external_statistics(self.hass, metadata, statistics)
+
+        self.high_water_marks[statistic_id] = {
+            "start": statistics[-1]["start"].isoformat(),
+            "value": statistics[-1]["state"],
+            "sum": total,
+        }
+        return True
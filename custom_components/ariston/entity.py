@@ -6,10 +6,11 @@ import logging
 from abc import ABC
 
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, AristonBaseEntityDescription
+from .const import ATTR_STALE, COORDINATOR, DOMAIN, AristonBaseEntityDescription
 from .ariston import DeviceAttribute
 from .coordinator import DeviceDataUpdateCoordinator, DeviceEnergyUpdateCoordinator
 
@@ -30,6 +31,46 @@ class AristonEntity(CoordinatorEntity, ABC):
         self.coordinator = coordinator
         self.entity_description: AristonBaseEntityDescription = description
 
+        self.written_available: bool = None
+
+    @property
+    def item_keys(self) -> set[tuple[str, int]]:
+        """Items of the device the state of the entity depends on"""
+        item_keys = {(self.entity_description.key, self.entity_description.zone)}
+        for extra_state in self.entity_description.extra_states or []:
+            item_keys.add((extra_state["Property"], extra_state.get("Zone", 0)))
+        return item_keys
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the polled items of the entity"""
+        await super().async_added_to_hass()
+        if self.entity_description.coordinator == COORDINATOR:
+            self.async_on_remove(
+                self.coordinator.device.subscribe_items(self.item_keys)
+            )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if availability or an item of the entity changed"""
+        changed_items = self.coordinator.changed_items
+        if (
+            changed_items is not None
+            and self.written_available == self.available
+            and changed_items.isdisjoint(self.item_keys)
+        ):
+            return
+        self.written_available = self.available
+        super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Energy entities stay available with old data of a failed source"""
+        energy_source = self.entity_description.energy_source
+        return super().available and (
+            energy_source is None
+            or self.coordinator.device.is_energy_source_available(energy_source)
+        )
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device specific attributes."""
@@ -48,8 +89,14 @@ class AristonEntity(CoordinatorEntity, ABC):
         """Return the holiday end date."""
         state_attributes = {}
 
+        if self.entity_description.energy_source is not None:
+            state_attributes[ATTR_STALE] = (
+                self.entity_description.energy_source
+                in self.coordinator.device.stale_energy_sources
+            )
+
         if self.entity_description.extra_states is None:
-            return None
+            return state_attributes or None
 
         for extra_state in self.entity_description.extra_states:
             state_attribute = self.coordinator.device.get_item_by_id(
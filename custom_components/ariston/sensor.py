@@ -5,7 +5,7 @@ import logging
 
 import homeassistant.util.dt as dt_util
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
@@ -18,12 +18,17 @@ from .ariston import (
 )
 from .const import (
     ARISTON_CONSUMPTION_LAST_MONTH_SENSORS_TYPES,
+    ARISTON_CONSUMPTION_ROLLING_SUM_SENSORS_TYPES,
     ARISTON_GAS_CONSUMPTION_LAST_TWO_HOURS_TYPE,
     ARISTON_SENSOR_TYPES,
     DOMAIN,
     AristonSensorEntityDescription,
 )
-from .coordinator import DeviceDataUpdateCoordinator, DeviceEnergyUpdateCoordinator
+from .coordinator import (
+    DeviceDataUpdateCoordinator,
+    DeviceEnergyUpdateCoordinator,
+    get_last_energy_bucket_start,
+)
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,7 +44,8 @@ async def async_setup_entry(
         description: AristonSensorEntityDescription,
         sensor_class: AristonSensor
         or AristonGasConsumptionLastTwoHoursSensor
-        or AristonEnergyLastMonthSensor,
+        or AristonEnergyLastMonthSensor
+        or AristonConsumptionRollingSumSensor,
     ):
         """Add new sensor instance to the sensors list if available"""
         coordinator: DeviceDataUpdateCoordinator or DeviceEnergyUpdateCoordinator = (
@@ -64,6 +70,9 @@ async def async_setup_entry(
     for description in ARISTON_CONSUMPTION_LAST_MONTH_SENSORS_TYPES:
         add_sensor(description, AristonEnergyLastMonthSensor)
 
+    for description in ARISTON_CONSUMPTION_ROLLING_SUM_SENSORS_TYPES:
+        add_sensor(description, AristonConsumptionRollingSumSensor)
+
     async_add_entities(ariston_sensors)
 
 
@@ -111,7 +120,10 @@ class AristonGasConsumptionLastTwoHoursSensor(AristonEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator, description)
 
-        self.current_consumptions_sequences = coordinator.device.consumptions_sequences
+        # k: consumption kind, p: period of the sequence
+        k, p = description.key.split("|")
+        self.sequence_key = (int(k), int(p))
+        self.sequence_version = None
         self.reset_datetime = None
 
     @property
@@ -124,17 +136,18 @@ class AristonGasConsumptionLastTwoHoursSensor(AristonEntity, SensorEntity):
     @property
     def native_value(self):
         """Set last_reset value if sequence is modified. Then return the last two hours value."""
-        if (
-            self.current_consumptions_sequences
-            != self.coordinator.device.consumptions_sequences
-        ):
-            self.reset_datetime = dt_util.utcnow() - timedelta(hours=1)
-            self.current_consumptions_sequences = (
-                self.coordinator.device.consumptions_sequences
-            )
-        return self.coordinator.device.consumptions_sequences[
-            int(self.entity_description.key)
-        ]["v"][-1]
+        sequence_version = self.coordinator.device.consumptions_sequence_versions.get(
+            self.sequence_key
+        )
+        if self.sequence_version != sequence_version:
+            # The last value is the bucket that ended at the last boundary
+            self.reset_datetime = get_last_energy_bucket_start(dt_util.now())
+            self.sequence_version = sequence_version
+
+        sequence = self.coordinator.device.get_consumptions_sequence(*self.sequence_key)
+        if sequence is None:
+            return None
+        return sequence.last
 
     @property
     def last_reset(self) -> datetime | None:
@@ -165,3 +178,35 @@ class AristonEnergyLastMonthSensor(AristonEntity, SensorEntity):
         return self.coordinator.device.energy_account["LastMonth"][int(values[0])][
             values[1]
         ]
+
+
+class AristonConsumptionRollingSumSensor(AristonEntity, SensorEntity):
+    """Class for consumption sums over the latest buckets of a sequence"""
+
+    def __init__(
+        self,
+        coordinator: DeviceDataUpdateCoordinator or DeviceEnergyUpdateCoordinator,
+        description: AristonSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description)
+
+        # k: consumption kind, p: period of the sequence, count: buckets to sum
+        k, p, count = description.key.split("|")
+        self.sequence_key = (int(k), int(p))
+        self.bucket_count = int(count)
+
+    @property
+    def unique_id(self):
+        """Return the unique id."""
+        return (
+            f"{self.coordinator.device.attributes[DeviceAttribute.GW_ID]}-{self.name}"
+        )
+
+    @property
+    def native_value(self):
+        """Return the sum of the latest buckets"""
+        sequence = self.coordinator.device.get_consumptions_sequence(*self.sequence_key)
+        if sequence is None:
+            return None
+        return round(sequence.rolling_sum(self.bucket_count), 3)
@@ -55,6 +55,11 @@ class AristonWaterHeater(AristonEntity, WaterHeaterEntity):
             f"{self.coordinator.device.attributes[DeviceAttribute.GW_ID]}-water_heater"
         )
 
+    @property
+    def item_keys(self) -> set[tuple[str, int]]:
+        """Items of the device the state of the entity depends on"""
+        return {(DeviceProperties.DHW_TEMP, 0), (DeviceProperties.DHW_MODE, 0)}
+
     @property
     def icon(self):
         return "mdi:water-pump"
@@ -142,10 +147,12 @@ class AristonWaterHeater(AristonEntity, WaterHeaterEntity):
             self.name,
         )
 
-        await self.coordinator.device.async_set_item_by_id(
+        # Slider changes are coalesced, show the new value until it is sent
+        write = self.coordinator.device.set_item_by_id_debounced(
             DeviceProperties.DHW_TEMP, temperature
         )
         self.async_write_ha_state()
+        await write
 
     async def async_set_operation_mode(self, operation_mode):
         """Set operation mode."""
@@ -0,0 +1,175 @@
+"""Micro-benchmarks of the Ariston request and device state hot paths.
+
+Run from the repository root, optionally with recorded cloud replies:
+
+    python -m tests.benchmark [--data-items FILE] [--sequences FILE]
+
+The default fixtures have the shape of the dataItems and consSequences
+replies of an 8-zone plant.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import timeit
+import tracemalloc
+
+from pathlib import Path
+from typing import Any, Callable
+
+from custom_components.ariston.ariston import (
+    DEVICE_PROPERTIES,
+    THERMOSTAT_PROPERTIES,
+    AristonAPI,
+    DeviceAttribute,
+    DeviceFeatures,
+    JsonCodec,
+    OrjsonCodec,
+    PropertyType,
+    ZoneAttribute,
+    orjson,
+)
+from custom_components.ariston.device import AristonDevice
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FixtureAPI(AristonAPI):
+    """API answering the dataItems request with a fixture"""
+
+    def __init__(self, data_items: bytes) -> None:
+        super().__init__("user", "password")
+        self.data_items = data_items
+
+    async def async_get_properties(self, *args, **kwargs) -> dict[str, Any]:
+        return JsonCodec.loads(self.data_items)
+
+
+def report(name: str, function: Callable, number: int) -> None:
+    """Print the average time of a function call"""
+    seconds = timeit.timeit(function, number=number) / number
+    print(f"  {name:<28} {seconds * 1e6:10.2f} us")
+
+
+def build_payload_uncached(features: dict[str, Any], culture: str) -> bytes:
+    """dataItems request built from scratch, as on every poll before the cache"""
+    items = [{"id": item_id, "zn": 0} for item_id in DEVICE_PROPERTIES]
+    for zone in features[DeviceFeatures.ZONES]:
+        for item_id in THERMOSTAT_PROPERTIES:
+            items.append({"id": item_id, "zn": zone[ZoneAttribute.NUM]})
+    return json.dumps(
+        {"items": items, "features": features, "culture": culture}
+    ).encode()
+
+
+def bench_payload(features: dict[str, Any], number: int) -> None:
+    """Build the dataItems request once per feature set"""
+    print("dataItems request payload")
+    api = AristonAPI("user", "password", json_codec=JsonCodec)
+    item_keys = tuple(api.get_item_keys(features))
+    get_payload = (
+        api._AristonAPI__get_properties_payload
+    )  # pylint: disable=protected-access
+    assert get_payload("gw", features, "en-US", item_keys) == build_payload_uncached(
+        features, "en-US"
+    )
+    report(
+        "built every poll",
+        lambda: build_payload_uncached(features, "en-US"),
+        number,
+    )
+    report(
+        "cached",
+        lambda: get_payload("gw", features, "en-US", item_keys),
+        number,
+    )
+
+
+def bench_codecs(replies: dict[str, bytes], number: int) -> None:
+    """Decode the replies with every installed codec"""
+    codecs = [JsonCodec] + ([OrjsonCodec] if orjson is not None else [])
+    for name, reply in replies.items():
+        print(f"{name} decode, {len(reply)} bytes")
+        for codec in codecs:
+            report(codec.name, lambda codec=codec: codec.loads(reply), number)
+    if orjson is None:
+        print("  orjson is not installed")
+
+
+def get_entity_lookups(device: AristonDevice) -> list[tuple[str, int]]:
+    """Items read per refresh, about what the entities of a plant do"""
+    zones = sorted({zone for _, zone in device.items if zone})
+    lookups = [(item_id, 0) for item_id in DEVICE_PROPERTIES] * 2
+    for zone in zones:
+        lookups += [(item_id, zone) for item_id in THERMOSTAT_PROPERTIES] * 2
+    return lookups
+
+
+def bench_lookups(device: AristonDevice, data: dict[str, Any], number: int) -> None:
+    """Item lookups by (id, zone)"""
+    lookups = get_entity_lookups(device)
+    print(f"item lookups, {len(data['items'])} items, {len(lookups)} per refresh")
+
+    def scan() -> None:
+        for item_id, zone in lookups:
+            next(
+                item[PropertyType.VALUE]
+                for item in data["items"]
+                if item["id"] == item_id and item[PropertyType.ZONE] == zone
+            )
+
+    def index() -> None:
+        for item_id, zone in lookups:
+            device.get_item_by_id(item_id, PropertyType.VALUE, zone)
+
+    report("linear scan", scan, number)
+    report("index", index, number)
+
+
+def bench_memory(data_items: bytes, features: dict[str, Any]) -> None:
+    """Memory held by the device state"""
+    print("device state memory")
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = JsonCodec.loads(data_items)
+    print(f"  {'decoded reply':<28} {tracemalloc.get_traced_memory()[0] - before:10} B")
+    del data
+
+    device = AristonDevice({DeviceAttribute.GW_ID: "gw"}, FixtureAPI(data_items), False)
+    device.features = features
+    before = tracemalloc.get_traced_memory()[0]
+    for poll in range(3):
+        asyncio.run(device.async_update_state())
+        retained = tracemalloc.get_traced_memory()[0] - before
+        print(f"  {f'item records, poll {poll + 1}':<28} {retained:10} B")
+    tracemalloc.stop()
+
+
+def main() -> None:
+    """Run every benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-items", type=Path, default=FIXTURES / "data_items.json")
+    parser.add_argument(
+        "--sequences", type=Path, default=FIXTURES / "consumptions_sequences.json"
+    )
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Compact, as sent by the cloud
+    data = json.loads(args.data_items.read_bytes())
+    data_items = JsonCodec.dumps(data)
+    sequences = JsonCodec.dumps(json.loads(args.sequences.read_bytes()))
+
+    device = AristonDevice({DeviceAttribute.GW_ID: "gw"}, FixtureAPI(data_items), False)
+    device.features = data["features"]
+    asyncio.run(device.async_update_state())
+
+    bench_payload(data["features"], args.number)
+    bench_codecs({"dataItems": data_items, "consSequences": sequences}, args.number)
+    bench_lookups(device, data, args.number // 5)
+    bench_memory(data_items, data["features"])
+
+
+if __name__ == "__main__":
+    main()
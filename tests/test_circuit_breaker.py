@@ -0,0 +1,38 @@
+"""Tests for the Ariston circuit breaker."""
+import pytest
+
+from custom_components.ariston.ariston import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    CircuitBreakerState,
+)
+
+
+def test_half_open_lets_one_probe_through():
+    """After the open timeout only one request probes the cloud"""
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreakerState.OPEN
+
+    breaker.before_request()
+    assert breaker.state == CircuitBreakerState.HALF_OPEN
+    with pytest.raises(CircuitBreakerOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreakerState.CLOSED
+    breaker.before_request()
+    breaker.before_request()
+
+
+def test_aborted_probe_frees_the_slot():
+    """A probe that ends without a result lets the next request probe"""
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.before_request()
+    breaker.record_failure()
+
+    breaker.before_request()
+    breaker.abort_request()
+    breaker.before_request()
+    assert breaker.state == CircuitBreakerState.HALF_OPEN
@@ -0,0 +1,107 @@
+"""Tests for the Ariston data update coordinator."""
+import asyncio
+
+import pytest
+
+from custom_components.ariston import coordinator as coordinator_module
+from custom_components.ariston.ariston import (
+    CircuitBreaker,
+    DeviceAttribute,
+    DeviceProperties,
+    ThermostatProperties,
+)
+from custom_components.ariston.const import ItemTier
+from custom_components.ariston.coordinator import DeviceDataUpdateCoordinator
+
+FAST_ITEM = (ThermostatProperties.ZONE_MEASURED_TEMP, 1)
+NORMAL_ITEM = (DeviceProperties.PLANT_MODE, 0)
+STATIC_ITEM = (DeviceProperties.ANTILEGIONELLA_TEMP, 0)
+
+
+class Device:
+    """Device recording the items each poll asks for"""
+
+    def __init__(self) -> None:
+        self.attributes = {DeviceAttribute.PLANT_NAME: "home"}
+        self.api = type("API", (), {"circuit_breaker": CircuitBreaker()})()
+        self.requested_items = (FAST_ITEM, NORMAL_ITEM, STATIC_ITEM)
+        self.unpolled_items = set()
+        self.pending_writes = {}
+        self.polls = []
+
+    def add_write_listener(self, listener):
+        return lambda: None
+
+    def expire_pending_writes(self) -> None:
+        pass
+
+    async def async_update_state(self, item_keys=None, stages=None):
+        self.polls.append(None if item_keys is None else set(item_keys))
+        return set()
+
+
+@pytest.fixture(name="coordinator")
+def coordinator_fixture(monkeypatch):
+    """Coordinator polling the fast tier every 20 s and the normal one every 60 s"""
+    clock = [1000.0]
+    monkeypatch.setattr(coordinator_module.time, "monotonic", lambda: clock[0])
+    coordinator = DeviceDataUpdateCoordinator(None, Device(), 60, 30, 20)
+    coordinator.clock = clock
+    return coordinator
+
+
+def poll_at(coordinator, seconds: float):
+    """Run the update at the given time, return the items it asked for"""
+    coordinator.clock[0] = 1000.0 + seconds
+    asyncio.run(coordinator._async_update_data())
+    return coordinator.device.polls[-1]
+
+
+def test_first_update_polls_every_tier(coordinator):
+    """Every tier is due before its first fetch, they go in one full poll"""
+    assert poll_at(coordinator, 0) is None
+    assert coordinator.tier_fetched == {
+        ItemTier.FAST: 1000.0,
+        ItemTier.NORMAL: 1000.0,
+        ItemTier.STATIC: 1000.0,
+    }
+
+
+def test_only_due_tiers_are_polled(coordinator):
+    """Each tick asks only for the items of the tiers whose interval is over"""
+    poll_at(coordinator, 0)
+    assert poll_at(coordinator, 20) == {FAST_ITEM}
+    assert poll_at(coordinator, 40) == {FAST_ITEM}
+    assert poll_at(coordinator, 60) == {FAST_ITEM, NORMAL_ITEM}
+    assert coordinator.update_interval.total_seconds() == 20
+
+
+def test_due_selection_tolerates_timer_jitter(coordinator):
+    """A tick a little early still polls the tier"""
+    poll_at(coordinator, 0)
+    assert poll_at(coordinator, 59) == {FAST_ITEM, NORMAL_ITEM}
+
+
+def test_static_tier_after_its_interval(coordinator):
+    """Static items wait for their long interval"""
+    poll_at(coordinator, 0)
+    static_seconds = coordinator.tier_intervals[ItemTier.STATIC].total_seconds()
+    assert STATIC_ITEM not in poll_at(coordinator, static_seconds - 20)
+    assert poll_at(coordinator, static_seconds) == {FAST_ITEM, STATIC_ITEM}
+
+
+def test_newly_subscribed_items_are_polled_at_once(coordinator):
+    """An item subscribed after the first poll does not wait for its tier"""
+    poll_at(coordinator, 0)
+    coordinator.device.unpolled_items = {STATIC_ITEM}
+    assert poll_at(coordinator, 20) == {FAST_ITEM, STATIC_ITEM}
+
+
+def test_no_request_when_no_tier_is_due(coordinator):
+    """A tick between the fast intervals sends nothing"""
+    poll_at(coordinator, 0)
+    polls = len(coordinator.device.polls)
+    coordinator.clock[0] = 1005.0
+    asyncio.run(coordinator._async_update_data())
+    assert len(coordinator.device.polls) == polls
+    assert coordinator.changed_items == set()
@@ -0,0 +1,243 @@
+"""Tests for the Ariston device writes."""
+import asyncio
+from datetime import date
+import time
+
+import pytest
+
+from custom_components.ariston.ariston import (
+    ARISTON_WRITE_CONFIRM_TIMEOUT,
+    AristonAPI,
+    DeviceAttribute,
+    DeviceProperties,
+    PropertyType,
+    ThermostatProperties,
+)
+from custom_components.ariston.device import AristonDevice
+
+ZONE = 1
+COMFORT_TEMP = (ThermostatProperties.ZONE_COMFORT_TEMP, ZONE)
+HOLIDAY = (DeviceProperties.HOLIDAY, 0)
+PLANT_MODE = (DeviceProperties.PLANT_MODE, 0)
+
+
+class Cloud(AristonAPI):
+    """API answering from an in-memory copy of the device items"""
+
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        self.values = {COMFORT_TEMP: 20.0, PLANT_MODE: 1, HOLIDAY: False}
+        self.writes = []
+        self.fail_writes = False
+        # Set to block the writes until the test releases them
+        self.write_gate: asyncio.Event = None
+        # Set to block the polls until the test releases them
+        self.poll_gate: asyncio.Event = None
+
+    async def async_get_properties(
+        self, gw_id, features, culture, umsys, item_keys=None
+    ):
+        values = dict(self.values)
+        if self.poll_gate is not None:
+            await self.poll_gate.wait()
+        return {
+            "items": [
+                {"id": item_id, PropertyType.ZONE: zone, PropertyType.VALUE: value}
+                for (item_id, zone), value in values.items()
+                if item_keys is None or (item_id, zone) in item_keys
+            ]
+        }
+
+    async def async_set_properties(self, gw_id, features, properties, umsys):
+        self.writes.append(properties)
+        fail_writes = self.fail_writes
+        if self.write_gate is not None:
+            await self.write_gate.wait()
+        if fail_writes:
+            raise ConnectionError("write failed")
+
+    async def async_set_holiday(self, gw_id, holiday_end_date):
+        self.writes.append(holiday_end_date)
+
+
+@pytest.fixture(name="device")
+def device_fixture():
+    """Device polling both items, with a short write window"""
+    device = AristonDevice(
+        {DeviceAttribute.GW_ID: "gateway"},
+        Cloud(),
+        extra_energy_features=False,
+        write_debounce_seconds=0.05,
+    )
+    device.subscribe_items([COMFORT_TEMP, PLANT_MODE, HOLIDAY])
+    return device
+
+
+def comfort_temp(device: AristonDevice):
+    """Value of the item as shown to the entities"""
+    return device.get_item_by_id(
+        ThermostatProperties.ZONE_COMFORT_TEMP, PropertyType.VALUE, ZONE
+    )
+
+
+def set_comfort_temp(device: AristonDevice, value: float):
+    """Set the item through the write window"""
+    return device.set_item_by_id_debounced(
+        ThermostatProperties.ZONE_COMFORT_TEMP, value, ZONE
+    )
+
+
+def test_debounced_writes_send_the_last_value_once(device):
+    """Values set during the window are shown at once and sent together"""
+
+    async def run():
+        await device.async_update_state()
+        waiters = []
+        for value in (21.0, 21.5, 22.0):
+            waiters.append(set_comfort_temp(device, value))
+            assert comfort_temp(device) == value
+        await asyncio.gather(*waiters)
+
+    asyncio.run(run())
+    assert device.api.writes == [[(*COMFORT_TEMP, 22.0, 20.0)]]
+    assert device.pending_writes[COMFORT_TEMP].value == 22.0
+
+
+def test_debounced_write_back_to_the_device_value_is_not_sent(device):
+    """Setting the value back within the window cancels the write"""
+
+    async def run():
+        await device.async_update_state()
+        first = set_comfort_temp(device, 21.0)
+        second = set_comfort_temp(device, 20.0)
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    assert not device.api.writes
+    assert COMFORT_TEMP not in device.pending_writes
+    assert comfort_temp(device) == 20.0
+
+
+def test_failed_debounced_write_rolls_back(device):
+    """A write the cloud refused shows the device value again"""
+
+    async def run():
+        await device.async_update_state()
+        device.api.fail_writes = True
+        with pytest.raises(ConnectionError):
+            await set_comfort_temp(device, 23.0)
+
+    asyncio.run(run())
+    assert comfort_temp(device) == 20.0
+    assert COMFORT_TEMP not in device.pending_writes
+
+
+def test_failed_debounced_write_keeps_a_newer_value(device):
+    """A value set while the write was in flight is not rolled back by its failure"""
+
+    async def run():
+        await device.async_update_state()
+        device.api.fail_writes = True
+        device.api.write_gate = asyncio.Event()
+        first = set_comfort_temp(device, 23.0)
+        while not device.api.writes:
+            await asyncio.sleep(0.01)
+
+        # The first window is over, this value starts a new write
+        device.api.fail_writes = False
+        second = set_comfort_temp(device, 24.0)
+        device.api.write_gate.set()
+        with pytest.raises(ConnectionError):
+            await first
+        await second
+
+    asyncio.run(run())
+    assert [write[0][2] for write in device.api.writes] == [23.0, 24.0]
+    assert comfort_temp(device) == 24.0
+    assert device.pending_writes[COMFORT_TEMP].value == 24.0
+
+
+def test_poll_in_flight_keeps_the_written_value(device):
+    """Data read before a write does not undo it, the confirming poll clears it"""
+
+    async def run():
+        await device.async_update_state()
+        device.api.poll_gate = asyncio.Event()
+        poll = asyncio.ensure_future(device.async_update_state())
+        await asyncio.sleep(0)
+
+        await device.async_set_item_by_id(
+            ThermostatProperties.ZONE_COMFORT_TEMP, 22.0, ZONE
+        )
+        device.api.poll_gate.set()
+        await poll
+        assert comfort_temp(device) == 22.0
+        assert COMFORT_TEMP in device.pending_writes
+
+        device.api.values[COMFORT_TEMP] = 22.0
+        await device.async_update_state()
+
+    asyncio.run(run())
+    assert comfort_temp(device) == 22.0
+    assert COMFORT_TEMP not in device.pending_writes
+    assert device.write_statistics["confirm_count"] == 1
+
+
+def test_holiday_write_keeps_its_end_date(device):
+    """The fence keeps every property set by the write, not only the value"""
+
+    async def run():
+        await device.async_update_state()
+        await device.async_set_holiday(date(2026, 12, 24))
+        await device.async_update_state()
+
+    asyncio.run(run())
+    assert device.get_item_by_id(DeviceProperties.HOLIDAY, PropertyType.VALUE)
+    assert (
+        device.get_item_by_id(DeviceProperties.HOLIDAY, PropertyType.EXPIRES_ON)
+        == "2026-12-24T00:00:00"
+    )
+
+
+def test_unconfirmed_write_gives_way_to_the_cloud_value(device):
+    """Past the confirmation timeout, a poll made after the write wins"""
+
+    async def run():
+        await device.async_update_state()
+        device.api.poll_gate = asyncio.Event()
+        poll = asyncio.ensure_future(device.async_update_state())
+        await asyncio.sleep(0)
+
+        await device.async_set_item_by_id(
+            ThermostatProperties.ZONE_COMFORT_TEMP, 22.0, ZONE
+        )
+        device.pending_writes[COMFORT_TEMP].written -= ARISTON_WRITE_CONFIRM_TIMEOUT + 1
+        device.api.poll_gate.set()
+        await poll
+        # Read before the write, it cannot tell whether the write failed
+        assert comfort_temp(device) == 22.0
+
+        await device.async_update_state()
+
+    asyncio.run(run())
+    assert comfort_temp(device) == 20.0
+    assert COMFORT_TEMP not in device.pending_writes
+    assert device.write_statistics["expired_count"] == 1
+
+
+def test_expire_pending_writes(device):
+    """Writes of items that are not polled expire on their own"""
+
+    async def run():
+        await device.async_update_state()
+        await device.async_set_item_by_id(
+            ThermostatProperties.ZONE_COMFORT_TEMP, 22.0, ZONE
+        )
+        await device.async_set_item_by_id(DeviceProperties.PLANT_MODE, 5)
+
+    asyncio.run(run())
+    device.pending_writes[COMFORT_TEMP].written = (
+        time.monotonic() - ARISTON_WRITE_CONFIRM_TIMEOUT - 1
+    )
+    device.expire_pending_writes()
+    assert set(device.pending_writes) == {PLANT_MODE}
+    assert device.write_expired_count == 1
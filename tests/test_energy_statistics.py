@@ -0,0 +1,183 @@
+"""Tests for the Ariston consumption statistics import."""
+import asyncio
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import homeassistant.util.dt as dt_util
+
+from custom_components.ariston import energy_statistics
+from custom_components.ariston.ariston import DeviceAttribute
+from custom_components.ariston.device import ConsumptionSequence
+from custom_components.ariston.energy_statistics import ConsumptionStatisticsImporter
+
+MONTHLY = (1, 4)
+TWO_HOURLY = (1, 1)
+STATISTIC_ID = "ariston:gw_consumption_1_4"
+
+
+class FakeStore:
+    """Store keeping the data in memory"""
+
+    def __init__(self, hass, version, key) -> None:
+        self.data = None
+        self.saves = 0
+
+    async def async_load(self):
+        return self.data
+
+    async def async_save(self, data) -> None:
+        self.data = data
+        self.saves += 1
+
+
+class Plant:
+    """Device with the consumption sequences of the energy coordinator"""
+
+    def __init__(self) -> None:
+        self.attributes = {
+            DeviceAttribute.GW_ID: "gw",
+            DeviceAttribute.PLANT_NAME: "home",
+        }
+        self.consumptions_sequences = {}
+        self.consumptions_sequence_versions = {}
+
+    def set_sequence(self, key, values) -> None:
+        """Store a fetched sequence, a new version if the values changed"""
+        sequence = self.consumptions_sequences.get(key)
+        if sequence is not None and list(sequence.values) == values:
+            return
+        self.consumptions_sequences[key] = ConsumptionSequence(
+            values, hash(tuple(values))
+        )
+        self.consumptions_sequence_versions[key] = (
+            self.consumptions_sequence_versions.get(key, 0) + 1
+        )
+
+
+@pytest.fixture(name="plant")
+def plant_fixture(monkeypatch):
+    """Importer of a plant, with the recorder and the clock replaced"""
+    imported = []
+    clock = SimpleNamespace(now=None)
+    monkeypatch.setattr(energy_statistics, "Store", FakeStore)
+    monkeypatch.setattr(
+        energy_statistics,
+        "async_add_external_statistics",
+        lambda hass, metadata, statistics: imported.append(
+            (metadata["statistic_id"], statistics)
+        ),
+    )
+    monkeypatch.setattr(dt_util, "now", lambda: clock.now)
+
+    return SimpleNamespace(
+        importer=ConsumptionStatisticsImporter(None, Plant()),
+        statistics=imported,
+        clock=clock,
+    )
+
+
+def run_import(plant, now, two_hourly, monthly) -> list:
+    """Import the sequences fetched at now, return the added statistics"""
+    plant.clock.now = now
+    plant.importer.device.set_sequence(TWO_HOURLY, two_hourly)
+    plant.importer.device.set_sequence(MONTHLY, monthly)
+    plant.statistics.clear()
+    asyncio.run(plant.importer.async_import())
+    return list(plant.statistics)
+
+
+def utc(*args) -> datetime:
+    """Time in the default time zone of the tests"""
+    return datetime(*args, tzinfo=dt_util.UTC)
+
+
+def test_backfill_after_the_first_short_rollover(plant):
+    """History is imported once the two hour sequence rolls, months are not waited"""
+    months = [float(month) for month in range(1, 13)]
+    assert not run_import(plant, utc(2024, 2, 10, 10, 30), [1.0, 2.0, 3.0], months)
+
+    # Rolled over at 12:00, the last monthly bucket is January
+    [(statistic_id, statistics)] = run_import(
+        plant, utc(2024, 2, 10, 12, 5), [2.0, 3.0, 4.0], months
+    )
+    assert statistic_id == STATISTIC_ID
+    assert [row["start"] for row in statistics[:2]] == [
+        utc(2023, 2, 1),
+        utc(2023, 3, 1),
+    ]
+    assert statistics[-1]["start"] == utc(2024, 1, 1)
+    assert statistics[-1]["sum"] == sum(months)
+    assert plant.importer.store.data[STATISTIC_ID] == {
+        "start": utc(2024, 1, 1).isoformat(),
+        "value": 12.0,
+        "sum": sum(months),
+    }
+
+
+def test_only_saved_when_the_mark_moves(plant):
+    """Rollovers without a new monthly bucket do not write to disk"""
+    months = [1.0] * 12
+    run_import(plant, utc(2024, 2, 10, 10, 30), [1.0, 2.0, 3.0], months)
+    run_import(plant, utc(2024, 2, 10, 12, 5), [2.0, 3.0, 4.0], months)
+    assert plant.importer.store.saves == 1
+
+    assert not run_import(plant, utc(2024, 2, 10, 14, 5), [3.0, 4.0, 5.0], months)
+    assert plant.importer.store.saves == 1
+
+
+def test_holds_until_the_long_sequence_rolls_over(plant):
+    """A month bucket published after the short rollover gets the right start"""
+    months = [float(month) for month in range(1, 13)]
+    run_import(plant, utc(2024, 2, 29, 20, 30), [1.0, 2.0, 3.0], months)
+    run_import(plant, utc(2024, 2, 29, 22, 5), [2.0, 3.0, 4.0], months)
+
+    # The month ended, but the monthly sequence is not updated yet
+    assert not run_import(plant, utc(2024, 3, 1, 0, 5), [3.0, 4.0, 5.0], months)
+
+    [(_, statistics)] = run_import(
+        plant, utc(2024, 3, 1, 0, 10), [3.0, 4.0, 5.0], months[1:] + [20.0]
+    )
+    assert [(row["start"], row["state"]) for row in statistics] == [
+        (utc(2024, 2, 1), 20.0)
+    ]
+    assert statistics[-1]["sum"] == sum(months) + 20.0
+
+
+def test_revised_bucket_does_not_stop_the_import(plant):
+    """A revised last bucket is held for a while, then the import goes on"""
+    months = [float(month) for month in range(1, 13)]
+    run_import(plant, utc(2024, 2, 10, 10, 30), [1.0, 2.0, 3.0], months)
+    run_import(plant, utc(2024, 2, 10, 12, 5), [2.0, 3.0, 4.0], months)
+
+    revised = months[:-1] + [12.5]
+    assert not run_import(plant, utc(2024, 2, 10, 14, 5), [3.0, 4.0, 5.0], revised)
+
+    later = utc(2024, 2, 10, 14, 5) + timedelta(
+        hours=energy_statistics.STATISTICS_MAX_HOLD_HOURS, minutes=2
+    )
+    run_import(plant, later, [4.0, 5.0, 6.0], revised)
+    assert plant.importer.store.data[STATISTIC_ID]["value"] == 12.5
+
+    # The next month is imported on top of the first sum
+    [(_, statistics)] = run_import(
+        plant, utc(2024, 3, 1, 0, 5), [5.0, 6.0, 7.0], revised[1:] + [30.0]
+    )
+    assert [(row["start"], row["sum"]) for row in statistics] == [
+        (utc(2024, 2, 1), sum(months) + 30.0)
+    ]
+
+
+def test_unrecognized_rollover_anchors_again(plant):
+    """A short sequence that did not shift as expected is anchored anew"""
+    months = [1.0] * 12
+    run_import(plant, utc(2024, 2, 10, 10, 30), [1.0, 2.0, 3.0], months)
+    run_import(plant, utc(2024, 2, 10, 12, 5), [2.0, 3.0, 4.0], months)
+
+    run_import(plant, utc(2024, 2, 10, 14, 5), [9.0, 9.0, 9.0], months)
+    assert plant.importer.published_until is None
+
+    run_import(plant, utc(2024, 2, 10, 16, 5), [9.0, 9.0, 1.0], months)
+    assert plant.importer.published_until == utc(2024, 2, 10, 16)
@@ -0,0 +1,67 @@
+"""Tests for the Ariston request limiter."""
+import asyncio
+
+from custom_components.ariston.ariston import RequestLimiter, RequestPriority
+
+
+def test_concurrency_cap():
+    """Requests over the concurrency cap wait for a release"""
+
+    async def run():
+        limiter = RequestLimiter(rate_limit=600, burst=10, max_concurrent=2)
+        await limiter.acquire(RequestPriority.POLL)
+        await limiter.acquire(RequestPriority.POLL)
+
+        waiter = asyncio.ensure_future(limiter.acquire(RequestPriority.POLL))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.active == 2
+
+    asyncio.run(run())
+
+
+def test_acquire_after_burst_is_drained():
+    """With nothing in flight, an empty bucket refills and lets the caller in"""
+
+    async def run():
+        # One token every 0.1 s
+        limiter = RequestLimiter(rate_limit=600, burst=3, max_concurrent=10)
+        for _ in range(3):
+            await limiter.acquire(RequestPriority.POLL)
+            limiter.release()
+
+        await asyncio.wait_for(limiter.acquire(RequestPriority.POLL), 1)
+        limiter.release()
+
+        # A cancelled waiter does not block the ones after it
+        cancelled = asyncio.ensure_future(limiter.acquire(RequestPriority.POLL))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.wait_for(limiter.acquire(RequestPriority.POLL), 1)
+        assert limiter.active == 1
+
+    asyncio.run(run())
+
+
+def test_configure_applies_to_queued_requests():
+    """Raising the limits lets the requests already queued in"""
+
+    async def run():
+        limiter = RequestLimiter(rate_limit=600, burst=10, max_concurrent=1)
+        await limiter.acquire(RequestPriority.POLL)
+
+        waiter = asyncio.ensure_future(limiter.acquire(RequestPriority.POLL))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        limiter.configure(rate_limit=600, burst=10, max_concurrent=2)
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.active == 2
+
+        limiter.configure(rate_limit=60, burst=1, max_concurrent=2)
+        assert limiter.tokens <= 1
+
+    asyncio.run(run())